@@ -0,0 +1,41 @@
+"""store role and inventory type as checked strings
+
+Revision ID: 0eaf6a5b8e6c
+Revises: b0e7dcb5c1dd
+Create Date: 2026-10-15 23:14:34.148231
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0eaf6a5b8e6c'
+down_revision: Union[str, Sequence[str], None] = 'b0e7dcb5c1dd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The ENUM columns as the models used to declare them; the stored labels are the new string values
+USER_ROLE = sa.Enum("admin", "cashier", name="userrole")
+INVENTORY_CHANGE_TYPE = sa.Enum("sale", "restock", "correction", name="inventorychangetype")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE users SET role = 'cashier' WHERE role IS NULL")
+    op.alter_column("users", "role", existing_type=USER_ROLE, type_=sa.String(16), nullable=False)
+    op.create_check_constraint("ck_users_role", "users", "role IN ('admin', 'cashier')")
+    op.alter_column("inventory_history", "type", existing_type=INVENTORY_CHANGE_TYPE, type_=sa.String(16), existing_nullable=False)
+    op.create_check_constraint(
+        "ck_inventory_history_type", "inventory_history", "type IN ('sale', 'restock', 'correction')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("ck_inventory_history_type", "inventory_history", type_="check")
+    op.alter_column("inventory_history", "type", existing_type=sa.String(16), type_=INVENTORY_CHANGE_TYPE, existing_nullable=False)
+    op.drop_constraint("ck_users_role", "users", type_="check")
+    op.alter_column("users", "role", existing_type=sa.String(16), type_=USER_ROLE, nullable=True)
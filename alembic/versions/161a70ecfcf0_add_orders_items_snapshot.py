@@ -0,0 +1,28 @@
+"""add orders.items_snapshot
+
+Revision ID: 161a70ecfcf0
+Revises: 8f67d7eda5d0
+Create Date: 2026-10-15 23:15:30.823894
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '161a70ecfcf0'
+down_revision: Union[str, Sequence[str], None] = '8f67d7eda5d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("orders", sa.Column("items_snapshot", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("orders", "items_snapshot")
@@ -0,0 +1,30 @@
+"""index orders.date and dues.order_id
+
+Revision ID: 1f1c1f566ec1
+Revises: 802b28c6c0b1
+Create Date: 2026-10-15 23:10:42.405517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f1c1f566ec1'
+down_revision: Union[str, Sequence[str], None] = '802b28c6c0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_orders_date", "orders", ["date"])
+    op.create_index("ix_dues_order_id", "dues", ["order_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_dues_order_id", table_name="dues")
+    op.drop_index("ix_orders_date", table_name="orders")
@@ -0,0 +1,40 @@
+"""case-insensitive collation for categories.name
+
+Revision ID: 6682e1973551
+Revises: 1f1c1f566ec1
+Create Date: 2026-10-15 23:10:43.051503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6682e1973551'
+down_revision: Union[str, Sequence[str], None] = '1f1c1f566ec1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails if two existing names differ only by case (accents still count); rename one of them first
+    op.alter_column(
+        "categories", "name",
+        existing_type=sa.String(50),
+        type_=mysql.VARCHAR(50, charset="utf8mb4", collation="utf8mb4_0900_as_ci"),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "categories", "name",
+        existing_type=mysql.VARCHAR(50, charset="utf8mb4", collation="utf8mb4_0900_as_ci"),
+        type_=sa.String(50),
+        existing_nullable=False,
+    )
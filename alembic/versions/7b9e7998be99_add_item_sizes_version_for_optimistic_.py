@@ -0,0 +1,30 @@
+"""add item_sizes.version for optimistic locking
+
+First revision: it runs against the schema the app had before migrations were introduced.
+
+Revision ID: 7b9e7998be99
+Revises: 
+Create Date: 2026-10-15 23:09:59.357447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b9e7998be99'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("item_sizes", sa.Column("version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("item_sizes", "version")
@@ -0,0 +1,28 @@
+"""index dues.shopper_id
+
+Revision ID: 802b28c6c0b1
+Revises: 7b9e7998be99
+Create Date: 2026-10-15 23:10:31.481783
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '802b28c6c0b1'
+down_revision: Union[str, Sequence[str], None] = '7b9e7998be99'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_dues_shopper_id", "dues", ["shopper_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_dues_shopper_id", table_name="dues")
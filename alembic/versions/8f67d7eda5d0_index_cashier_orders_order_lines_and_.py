@@ -0,0 +1,46 @@
+"""index cashier orders, order lines and inventory history
+
+Revision ID: 8f67d7eda5d0
+Revises: 0eaf6a5b8e6c
+Create Date: 2026-10-15 23:14:58.253128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f67d7eda5d0'
+down_revision: Union[str, Sequence[str], None] = '0eaf6a5b8e6c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("orders", "ix_orders_cashier_id_date", ["cashier_id", "date"]),
+    ("order_items", "ix_order_items_order_id", ["order_id"]),
+    ("order_items", "ix_order_items_item_id", ["item_id"]),
+    ("inventory_history", "ix_inventory_history_item_id_date", ["item_id", "date"]),
+    ("inventory_history", "ix_inventory_history_performed_by_id_date", ["performed_by_id", "date"]),
+]
+INDEX_NAMES = {name for _, name, _ in INDEXES}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, name, columns in INDEXES:
+        op.create_index(name, table, columns)
+        # The plain foreign key index on the leading column is now redundant. MySQL drops
+        # the ones it generated itself, so this reflects what is left after the create
+        for index in sa.inspect(op.get_bind()).get_indexes(table):
+            if index["column_names"] == columns[:1] and index["name"] not in INDEX_NAMES:
+                op.drop_index(index["name"], table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, columns in reversed(INDEXES):
+        # MySQL won't drop an index a foreign key relies on, so put back a plain one first
+        op.create_index(columns[0], table, columns[:1])
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,32 @@
+"""store money columns as DECIMAL(12,2)
+
+Revision ID: a6875ad02231
+Revises: bb4f9925ef4b
+Create Date: 2026-10-15 23:12:01.759494
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6875ad02231'
+down_revision: Union[str, Sequence[str], None] = 'bb4f9925ef4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = [("orders", "amount"), ("order_items", "price_at_purchase"), ("dues", "amount")]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column, existing_type=sa.Float(), type_=sa.Numeric(12, 2), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column, existing_type=sa.Numeric(12, 2), type_=sa.Float(), existing_nullable=False)
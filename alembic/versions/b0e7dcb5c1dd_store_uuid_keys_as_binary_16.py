@@ -0,0 +1,115 @@
+"""store UUID keys as BINARY(16)
+
+Every id and foreign key column goes from CHAR(36) text to the 16 bytes BinaryUUID stores,
+with the time-low and time-high fields swapped (what MySQL's UUID_TO_BIN(id, 1) produces).
+Each column gets a BINARY(16) shadow column that is backfilled and then swapped in; the
+foreign keys and the indexes on these columns are dropped first and re-created afterwards.
+MySQL DDL is not transactional, so take a backup before running this on production data.
+
+Revision ID: b0e7dcb5c1dd
+Revises: a6875ad02231
+Create Date: 2026-10-15 23:12:24.538247
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0e7dcb5c1dd'
+down_revision: Union[str, Sequence[str], None] = 'a6875ad02231'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# UUID columns by table as (column, nullable); every table's primary key is `id`
+UUID_COLUMNS = {
+    "users": [("id", False)],
+    "categories": [("id", False)],
+    "items": [("id", False), ("category_id", True)],
+    "item_sizes": [("id", False), ("item_id", True)],
+    "shoppers": [("id", False)],
+    "orders": [("id", False), ("cashier_id", True), ("shopper_id", True)],
+    "dues": [("id", False), ("shopper_id", False), ("order_id", True)],
+    "order_items": [("id", False), ("order_id", True), ("item_id", True)],
+    "inventory_history": [("id", False), ("item_id", True), ("performed_by_id", True)],
+}
+
+# 'aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee' -> UNHEX('ccccbbbbaaaaaaaadddd' 'eeeeeeeeeeee')
+TO_BINARY = (
+    "UNHEX(CONCAT(SUBSTR({col}, 15, 4), SUBSTR({col}, 10, 4), SUBSTR({col}, 1, 8), "
+    "SUBSTR({col}, 20, 4), SUBSTR({col}, 25, 12)))"
+)
+# And back again, for the downgrade
+TO_TEXT = (
+    "LOWER(CONCAT_WS('-', SUBSTR(HEX({col}), 9, 8), SUBSTR(HEX({col}), 5, 4), "
+    "SUBSTR(HEX({col}), 1, 4), SUBSTR(HEX({col}), 17, 4), SUBSTR(HEX({col}), 21, 12)))"
+)
+
+
+def _convert(column_type: str, expression: str) -> None:
+    """Rewrite every UUID column as `column_type`, computing the new values with `expression`."""
+    if context.is_offline_mode():
+        raise RuntimeError("This migration reads constraint names from the database; run it online")
+
+    inspector = sa.inspect(op.get_bind())
+    foreign_keys = {table: inspector.get_foreign_keys(table) for table in UUID_COLUMNS}
+    # Dropping a column silently removes it from composite indexes, so every index that
+    # covers a UUID column (including MySQL's implicit foreign key indexes) is rebuilt
+    indexes = {
+        table: [
+            index for index in inspector.get_indexes(table)
+            if {name for name, _ in columns} & set(index["column_names"])
+        ]
+        for table, columns in UUID_COLUMNS.items()
+    }
+
+    for table, table_foreign_keys in foreign_keys.items():
+        for foreign_key in table_foreign_keys:
+            op.drop_constraint(foreign_key["name"], table, type_="foreignkey")
+    for table, table_indexes in indexes.items():
+        for index in table_indexes:
+            op.drop_index(index["name"], table_name=table)
+
+    for table, columns in UUID_COLUMNS.items():
+        for name, _ in columns:
+            op.execute(f"ALTER TABLE {table} ADD COLUMN {name}_new {column_type} NULL AFTER {name}")
+        op.execute(
+            f"UPDATE {table} SET "
+            + ", ".join(f"{name}_new = {expression.format(col=name)}" for name, _ in columns)
+        )
+        op.execute(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, "
+            + ", ".join(f"DROP COLUMN {name}" for name, _ in columns)
+        )
+        # NOT NULL also stops the migration if any id was not a valid UUID (UNHEX gave NULL)
+        op.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(
+                f"CHANGE COLUMN {name}_new {name} {column_type} {'NULL' if nullable else 'NOT NULL'}"
+                for name, nullable in columns
+            )
+            + ", ADD PRIMARY KEY (id)"
+        )
+
+    for table, table_indexes in indexes.items():
+        for index in table_indexes:
+            op.create_index(index["name"], table, index["column_names"], unique=index["unique"])
+    for table, table_foreign_keys in foreign_keys.items():
+        for foreign_key in table_foreign_keys:
+            op.create_foreign_key(
+                foreign_key["name"], table, foreign_key["referred_table"],
+                foreign_key["constrained_columns"], foreign_key["referred_columns"],
+                **foreign_key.get("options", {}),
+            )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _convert("BINARY(16)", TO_BINARY)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert("CHAR(36)", TO_TEXT)
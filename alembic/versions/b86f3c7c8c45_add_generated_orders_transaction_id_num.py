@@ -0,0 +1,35 @@
+"""add generated orders.transaction_id_num
+
+Revision ID: b86f3c7c8c45
+Revises: 6682e1973551
+Create Date: 2026-10-15 23:11:29.228495
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b86f3c7c8c45'
+down_revision: Union[str, Sequence[str], None] = '6682e1973551'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("orders", sa.Column(
+        "transaction_id_num",
+        sa.Integer(),
+        sa.Computed("CASE WHEN transaction_id REGEXP '^[0-9]+$' THEN CAST(transaction_id AS UNSIGNED) END", persisted=True),
+    ))
+    # Same name create_all gives the column's inline UNIQUE
+    op.create_unique_constraint("transaction_id_num", "orders", ["transaction_id_num"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("transaction_id_num", "orders", type_="unique")
+    op.drop_column("orders", "transaction_id_num")
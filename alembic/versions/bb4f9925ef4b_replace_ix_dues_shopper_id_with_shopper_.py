@@ -0,0 +1,31 @@
+"""replace ix_dues_shopper_id with (shopper_id, amount)
+
+Revision ID: bb4f9925ef4b
+Revises: b86f3c7c8c45
+Create Date: 2026-10-15 23:11:36.647997
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb4f9925ef4b'
+down_revision: Union[str, Sequence[str], None] = 'b86f3c7c8c45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Created before the old index is dropped, so dues.shopper_id's foreign key always has an index
+    op.create_index("ix_dues_shopper_id_amount", "dues", ["shopper_id", "amount"])
+    op.drop_index("ix_dues_shopper_id", table_name="dues")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_dues_shopper_id", "dues", ["shopper_id"])
+    op.drop_index("ix_dues_shopper_id_amount", table_name="dues")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload, noload
 from sqlalchemy import func, or_
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -13,7 +13,7 @@ from app.db.models import (
     Item, ItemSize, InventoryHistory, InventoryChangeType,
     Order, OrderItem, User, UserRole, Category
 )
-from app.core.security import validate_admin
+from app.core.security import validate_admin, get_user_by_username
 from app.db.supabase_client import supabase
 from app.api.schemas.item import (
     ItemCreate, ItemResponse, ItemUpdate, ItemSizeCreate, ItemSizeUpdate,
@@ -31,11 +31,11 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 # Import models and schemas
 
 # --- Helper Functions ---
-async def validate_image(file: UploadFile) -> None:
+def validate_image(file: UploadFile) -> None:
     """Validate image file size and type"""
     # Check file size
-    contents = await file.read()
-    await file.seek(0)  # Reset file pointer
+    contents = file.file.read()
+    file.file.seek(0)  # Reset file pointer
     
     if len(contents) > MAX_IMAGE_SIZE:
         raise HTTPException(
@@ -50,7 +50,7 @@ async def validate_image(file: UploadFile) -> None:
             detail=f"File type {file.content_type} not allowed. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}"
         )
 
-async def upload_image_to_supabase(file: UploadFile) -> str:
+def upload_image_to_supabase(file: UploadFile) -> str:
     """Upload image to Supabase storage and return the public URL"""
     try:
         # Generate unique filename with safe extension handling
@@ -58,10 +58,10 @@ async def upload_image_to_supabase(file: UploadFile) -> str:
         file_extension = os.path.splitext(original_filename)[1].lower()
         if not file_extension:
             file_extension = ".jpg"  # Default extension if none provided
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
+        unique_filename = f"{uuid.uuid4().hex}{file_extension}"
         
         # Upload file to Supabase storage
-        contents = await file.read()
+        contents = file.file.read()
         result = supabase.storage.from_(STORAGE_BUCKET).upload(
             unique_filename,
             contents
@@ -77,11 +77,11 @@ async def upload_image_to_supabase(file: UploadFile) -> str:
             detail=f"Failed to upload image: {str(e)}"
         )
     finally:
-        await file.close()
+        file.file.close()
 
 # --- Item Management ---
 @router.post("/add-items/", status_code=status.HTTP_201_CREATED, response_model=ItemResponse)
-async def add_item(
+def add_item(
     image: UploadFile = File(...),
     item_data: str = Form(...),
     db: Session = Depends(get_db),
@@ -121,13 +121,13 @@ async def add_item(
 
         # Get the performing user
         username = token.get("sub")
-        user = db.query(User).filter(User.username == username).first()
+        user = get_user_by_username(db, username)
         if not user:
             raise HTTPException(status_code=401, detail="Performing user not found")
 
         # Validate and upload image
-        await validate_image(image)
-        image_url = await upload_image_to_supabase(image)
+        validate_image(image)
+        image_url = upload_image_to_supabase(image)
 
         # Create the item with the image URL and category
         db_item = Item(
@@ -162,8 +162,7 @@ async def add_item(
 
         # Now commit everything together
         db.commit()
-        db.refresh(db_item)
-        return db_item
+        return ItemResponse.from_orm_fast(db_item)
 
     except HTTPException:
         raise
@@ -243,11 +242,11 @@ def get_item(
     """
     Get detailed information about a specific item including all its sizes and category
     """
-    db_item = db.query(Item).options(joinedload(Item.category_obj))\
+    db_item = db.query(Item).options(joinedload(Item.category_obj), selectinload(Item.sizes))\
         .filter(Item.id == item_id).first()
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
-    return db_item
+    return ItemResponse.from_orm_fast(db_item)
 
 @router.get("/items/", response_model=List[ItemResponse])
 def list_items(
@@ -262,7 +261,7 @@ def list_items(
     - category_id: Filter items by category
     - search: Search term to filter items by name
     """
-    query = db.query(Item).options(joinedload(Item.category_obj))
+    query = db.query(Item).options(joinedload(Item.category_obj), selectinload(Item.sizes))
     
     if category_id:
         query = query.filter(Item.category_id == category_id)
@@ -272,7 +271,7 @@ def list_items(
         query = query.filter(Item.name.ilike(search_term))
     
     items = query.all()
-    return items
+    return [ItemResponse.from_orm_fast(item) for item in items]
 
 @router.get("/items/list", response_model=List[ItemListResponse])
 def list_items_with_details(
@@ -327,7 +326,7 @@ def list_items_with_details(
     return result
 
 @router.put("/items/{item_id}", response_model=ItemResponse)
-async def update_item(
+def update_item(
     item_id: str,
     image: Optional[UploadFile] = File(None),
     item_data: str = Form(...),
@@ -357,7 +356,7 @@ async def update_item(
         
         # Get the performing user
         username = token.get("sub")
-        user = db.query(User).filter(User.username == username).first()
+        user = get_user_by_username(db, username)
         if not user:
             raise HTTPException(status_code=401, detail="Performing user not found")
 
@@ -368,8 +367,8 @@ async def update_item(
 
         # Handle image update if provided
         if image:
-            await validate_image(image)
-            image_url = await upload_image_to_supabase(image)
+            validate_image(image)
+            image_url = upload_image_to_supabase(image)
             db_item.image_url = image_url
 
         # Update item fields
@@ -460,7 +459,7 @@ async def update_item(
         try:
             db.commit()
             db.refresh(db_item)
-            return db_item
+            return ItemResponse.from_orm_fast(db_item)
         except Exception as e:
             db.rollback()
             raise HTTPException(
@@ -477,7 +476,7 @@ async def update_item(
         )
 
 @router.post("/inventory/restock/")
-async def restock_item(
+def restock_item(
     restock: RestockRequest,
     db: Session = Depends(get_db),
     token: dict = Depends(validate_admin)
@@ -489,7 +488,7 @@ async def restock_item(
 
     # Look up the performing user by username in the token
     username = token.get("sub")
-    user = db.query(User).filter(User.username == username).first()
+    user = get_user_by_username(db, username)
     if not user:
         raise HTTPException(status_code=401, detail="Performing user not found")
 
@@ -518,7 +517,7 @@ async def restock_item(
 
 
 @router.get("/inventory/history/")
-async def get_inventory_history(
+def get_inventory_history(
     item_id: Optional[str] = None,
     type: Optional[InventoryChangeType] = None,
     start_date: Optional[datetime] = Query(None, description="Start date for filtering"),
@@ -535,7 +534,8 @@ async def get_inventory_history(
         Item.name.label('item_name'),
         User.username.label('username')
     ).join(Item, InventoryHistory.item_id == Item.id
-    ).join(User, InventoryHistory.performed_by_id == User.id)
+    ).join(User, InventoryHistory.performed_by_id == User.id
+    ).options(noload(InventoryHistory.performed_by))  # username is already selected above
     
     if item_id:
         query = query.filter(InventoryHistory.item_id == item_id)
@@ -575,7 +575,7 @@ async def get_inventory_history(
 
 # --- Sales Management ---
 @router.get("/sales/")
-async def get_sales(
+def get_sales(
     date_range: Optional[DateRangeFilter] = None,
     db: Session = Depends(get_db),
     _: dict = Depends(validate_admin)
@@ -592,14 +592,14 @@ async def get_sales(
 
 # --- User Management ---
 @router.get("/users/")
-async def get_users(
+def get_users(
     db: Session = Depends(get_db),
     _: dict = Depends(validate_admin)
 ):
     return db.query(User).all()
 
 @router.delete("/items/{item_id}/image", status_code=status.HTTP_200_OK)
-async def delete_item_image(
+def delete_item_image(
     item_id: str,
     db: Session = Depends(get_db),
     token: dict = Depends(validate_admin)
@@ -22,7 +22,7 @@ from app.api.schemas.admin_dashboard import (
 router = APIRouter(prefix="/admin/dashboard", tags=["admin-dashboard"])
 
 @router.get("/revenue-by-date", response_model=List[RevenueByDateResponse])
-async def get_revenue_by_date(
+def get_revenue_by_date(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -53,7 +53,7 @@ async def get_revenue_by_date(
     ]
 
 @router.get("/total-revenue", response_model=TotalRevenueResponse)
-async def get_total_revenue(
+def get_total_revenue(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -79,7 +79,7 @@ async def get_total_revenue(
     )
 
 @router.get("/sales-by-category", response_model=List[SalesByCategoryResponse])
-async def get_sales_by_category(
+def get_sales_by_category(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -114,7 +114,7 @@ async def get_sales_by_category(
     ]
 
 @router.get("/payment-method-breakdown", response_model=List[PaymentMethodBreakdownResponse])
-async def get_payment_method_breakdown(
+def get_payment_method_breakdown(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -162,7 +162,7 @@ async def get_payment_method_breakdown(
     ]
 
 @router.get("/low-stock-items", response_model=List[LowStockItemResponse])
-async def get_low_stock_items(
+def get_low_stock_items(
     threshold: int = 10,
     db: Session = Depends(get_db),
     _: dict = Depends(validate_admin)
@@ -191,7 +191,7 @@ async def get_low_stock_items(
     ]
 
 @router.get("/inventory-movement", response_model=List[InventoryMovementResponse])
-async def get_inventory_movement(
+def get_inventory_movement(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -217,14 +217,14 @@ async def get_inventory_movement(
     return [
         InventoryMovementResponse(
             item_name=result.item_name,
-            change_type=result.change_type.value,
+            change_type=result.change_type,
             total_change=int(result.total_change) if result.total_change else 0
         )
         for result in results
     ]
 
 @router.get("/best-selling-items", response_model=List[BestSellingItemResponse])
-async def get_best_selling_items(
+def get_best_selling_items(
     limit: int = 10,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -257,7 +257,7 @@ async def get_best_selling_items(
     ]
 
 @router.get("/staff-performance", response_model=List[StaffPerformanceResponse])
-async def get_staff_performance(
+def get_staff_performance(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     db: Session = Depends(get_db),
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
@@ -64,18 +64,13 @@ def verify_user_token(authorization: Optional[str] = Header(None)):
     return {"message": "Token is valid", "role": role}
 
 @router.post("/signup", response_model=TokenResponse)
-def signup(payload: SignupRequest, db: Session = Depends(get_db)):
+def signup(payload: SignupRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     if db.query(User).filter(User.username == payload.username).first():
         raise HTTPException(status_code=400, detail="Username already exists")
 
     # Generate random password
     generated_password = generate_random_password()
     
-    # Send password via email
-    email_sent = send_password_email(payload.username, generated_password)
-    if not email_sent:
-        raise HTTPException(status_code=500, detail="Failed to send password email")
-    
     # Hash the generated password
     hashed_password = hash_password(generated_password)
     
@@ -87,9 +82,12 @@ def signup(payload: SignupRequest, db: Session = Depends(get_db)):
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
 
-    role_str = user.role.value
+    # Send password via email once the response has gone out, keeping the SMTP round-trips
+    # off the request path; delivery failures are logged by send_password_email
+    background_tasks.add_task(send_password_email, payload.username, generated_password)
+
+    role_str = user.role
     access = create_access_token({"sub": user.username, "scope": [role_str]})
     refresh = create_refresh_token({"sub": user.username, "scope": [role_str]})
     return {"access_token": access, "refresh_token": refresh, "role": role_str}
@@ -105,7 +103,7 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    role_str = user.role.value
+    role_str = user.role
     access = create_access_token({"sub": user.username, "scope": [role_str]})
     refresh = create_refresh_token({"sub": user.username, "scope": [role_str]})
     return {"access_token": access, "refresh_token": refresh , "role": role_str  }
@@ -127,7 +125,7 @@ def refresh_tokens(payload: RefreshRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
 
     new_access = refresh_access_token(payload.refresh_token, user.username)
-    role_str = user.role.value
+    role_str = user.role
     new_refresh = create_refresh_token({"sub": user.username, "scope": [role_str]})
     return {"access_token": new_access, "refresh_token": new_refresh}
 
@@ -1,16 +1,42 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, Path, Body
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, cast, Integer, or_
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload, undefer
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import func, or_, update, insert, select, bindparam, lambda_stmt, exists
 from typing import List, Optional
+from datetime import datetime
 from pydantic import BaseModel
 from app.db.db import get_db
 from app.db.models import Item, ItemSize, Category, Due
 from app.api.schemas.item import ItemListResponse
 from app.api.schemas.category import CategoryResponse
 from app.api.schemas.order import OrderCreate, OrderResponse, OrderItemResponse, PaginatedSalesResponse
-from app.db.models import Order, OrderItem, InventoryHistory, InventoryChangeType, User, Shopper, Due
-from app.core.security import validate_cashier
-router = APIRouter(prefix="/cashier", tags=["Cashier"])
+from app.db.models import Order, OrderItem, InventoryHistory, InventoryChangeType, User, Shopper, Due, generate_id
+from app.core.security import validate_cashier, get_current_cashier
+from app.core.cache import invalidate_shoppers
+router = APIRouter(prefix="/cashier", tags=["Cashier"], default_response_class=ORJSONResponse)
+
+# Attempts made to apply a stock change before giving up on a contended ItemSize row
+STOCK_UPDATE_RETRIES = 3
+
+# Hot-path statements built once per process; lambda_stmt caches their construction
+# and compiled SQL so per-request/per-line calls only bind parameters
+_item_size_by_label = lambda_stmt(
+    lambda: select(ItemSize).options(joinedload(ItemSize.item)).where(
+        ItemSize.item_id == bindparam("item_id"),
+        ItemSize.size_label == bindparam("size_label")
+    )
+)
+_order_by_id = lambda_stmt(
+    lambda: select(Order).options(
+        joinedload(Order.items).joinedload(OrderItem.item)
+    ).where(Order.id == bindparam("order_id"))
+)
+_order_by_identifier = lambda_stmt(
+    lambda: select(Order).options(undefer(Order.items_snapshot)).where(
+        or_(Order.id == bindparam("order_id"), Order.transaction_id == bindparam("transaction_id"))
+    )
+)
 
 class ReturnItemRequest(BaseModel):
     item_id: str
@@ -24,10 +50,27 @@ class ReturnRequest(BaseModel):
     # "cash" (default) or "advance" (store as credit)
     refund_method: Optional[str] = "cash"
 
+def _snapshot_line(order_item: OrderItem, item_name: str, category_name: str) -> dict:
+    """One receipt line as stored in Order.items_snapshot (the OrderItemResponse fields).
+    The price is rounded the way the DECIMAL(12,2) order_items column stores it, so the
+    snapshot and the order line agree.
+    """
+    return {
+        "id": order_item.id,
+        "item_id": order_item.item_id,
+        "item_name": item_name,
+        "size_label": order_item.size_label,
+        "quantity": order_item.quantity,
+        "price_at_purchase": round(order_item.price_at_purchase, 2),
+        "discount_applied": order_item.discount_applied,
+        "category_name": category_name
+    }
+
 def _compute_balances(db: Session, shopper_id: Optional[str]):
     """Compute aggregate dues and advance balances for a shopper.
     dues_balance: positive amount owed by shopper
     advance_balance: positive credit available to shopper
+    Both come from one net SUM over the shopper's dues (an index seek on dues.shopper_id).
     """
     if not shopper_id:
         return {"dues_balance": 0.0, "advance_balance": 0.0}
@@ -39,6 +82,44 @@ def _compute_balances(db: Session, shopper_id: Optional[str]):
     else:
         return {"dues_balance": 0.0, "advance_balance": 0.0}
 
+def _next_transaction_id(db: Session) -> int:
+    """Allocate the next numeric transaction ID (starting at 1000).
+    MAX over the unique transaction_id_num index is a single index lookup, and
+    FOR UPDATE holds the index tail so concurrent checkouts cannot take the same ID.
+    """
+    last_numeric_id = db.query(func.max(Order.transaction_id_num)).with_for_update().scalar() or 0
+    return max(last_numeric_id, 999) + 1
+
+def _apply_stock_change(db: Session, item_size: ItemSize, delta: int):
+    """Apply a stock delta to an ItemSize under optimistic locking.
+    If another cashier updated the same row first (StaleDataError), the row is
+    re-read and the change retried against the latest stock.
+    """
+    for _ in range(STOCK_UPDATE_RETRIES):
+        if item_size.stock + delta < 0:
+            raise HTTPException(status_code=400, detail=f"Not enough stock for {item_size.item.name} ({item_size.size_label})")
+        try:
+            with db.begin_nested():
+                item_size.stock += delta
+            return item_size
+        except StaleDataError:
+            # Locking read only on the conflict path so we see the latest committed stock
+            db.refresh(item_size, with_for_update=True)
+    raise HTTPException(status_code=409, detail=f"Stock for {item_size.item.name} ({item_size.size_label}) is being updated concurrently, please retry")
+
+def _decrement_stock(db: Session, item_size: ItemSize, quantity: int):
+    """Atomically take quantity out of stock in a single conditional UPDATE.
+    The stock check happens in the WHERE clause, so no read-modify-write race.
+    The version is bumped so optimistic-locked writers see the change.
+    """
+    result = db.execute(
+        update(ItemSize)
+        .where(ItemSize.id == item_size.id, ItemSize.stock >= quantity)
+        .values(stock=ItemSize.stock - quantity, version=ItemSize.version + 1)
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=400, detail=f"Not enough stock for {item_size.item.name} ({item_size.size_label})")
+
 @router.get("/items/", response_model=List[ItemListResponse])
 def list_items_for_cashier(
     search: Optional[str] = Query(None, description="Search by item name"),
@@ -52,12 +133,14 @@ def list_items_for_cashier(
     List items for cashier with search, pagination, and category filter.
     Each item includes: id, name, image_url, category, sizes (with stock, price, discount percent, etc).
     """
-    query = db.query(Item).options(joinedload(Item.sizes), joinedload(Item.category_obj))
+    stmt = lambda_stmt(lambda: select(Item).options(joinedload(Item.sizes)))
     if search:
-        query = query.filter(Item.name.ilike(f"%{search}%"))
+        search_term = f"%{search}%"
+        stmt += lambda s: s.where(Item.name.ilike(search_term))
     if category_id:
-        query = query.filter(Item.category_id == category_id)
-    items = query.offset(skip).limit(limit).all()
+        stmt += lambda s: s.where(Item.category_id == category_id)
+    stmt += lambda s: s.offset(skip).limit(limit)
+    items = db.execute(stmt).unique().scalars().all()
 
     result = []
     for item in items:
@@ -85,13 +168,13 @@ def list_items_for_cashier(
                 "stock": size.stock,
                 "created_at": size.created_at
             })
-        result.append({
-            "id": item.id,
-            "name": item.name,
-            "image_url": item.image_url,
-            "category": category_data,
-            "sizes": sizes_data
-        })
+        result.append(ItemListResponse(
+            id=item.id,
+            name=item.name,
+            image_url=item.image_url,
+            category=category_data,
+            sizes=sizes_data
+        ))
     return result
 
 @router.get("/categories", response_model=List[CategoryResponse])
@@ -109,15 +192,11 @@ def list_categories_for_cashier(
 def create_order_for_cashier(
     order: OrderCreate,
     db: Session = Depends(get_db),
-    token: dict = Depends(validate_cashier)
+    user: User = Depends(get_current_cashier)
 ):
     """
     Create a new order as cashier.
     """
-    username = token.get("sub")
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Cashier not found")
 
     shopper_id = None
     if order.customer_code:
@@ -128,23 +207,28 @@ def create_order_for_cashier(
 
     total = 0.0
     order_items = []
+    # Receipt lines, stored on the order and used for the response
+    items_snapshot = []
+    # Per-request cache of category discount by category_id
+    category_discounts = {}
     for item_data in order.items:
-        item_size = db.query(ItemSize).options(joinedload(ItemSize.item).joinedload(Item.category_obj)).filter(
-            ItemSize.item_id == item_data.item_id,
-            ItemSize.size_label == item_data.size_label
-        ).first()
+        item_size = db.execute(
+            _item_size_by_label, {"item_id": item_data.item_id, "size_label": item_data.size_label}
+        ).scalars().first()
         if not item_size:
             raise HTTPException(status_code=404, detail=f"Item with ID {item_data.item_id} and size {item_data.size_label} not found")
-        if item_size.stock < item_data.quantity:
-            raise HTTPException(status_code=400, detail=f"Not enough stock for {item_size.item.name} ({item_data.size_label})")
 
-        category_discount = item_size.item.category_obj.discount if item_size.item.category_obj else None
+        item = item_size.item
+        if item.category_id not in category_discounts:
+            category_discounts[item.category_id] = item.category_obj.discount if item.category_obj else None
+        category_discount = category_discounts[item.category_id]
         effective_discount = category_discount if category_discount is not None and category_discount > 0 else (item_size.discount or 0.0)
         
         price_after_discount = item_size.price * (1 - (effective_discount / 100.0))
         total += price_after_discount * item_data.quantity
 
         order_item = OrderItem(
+            id=generate_id(),
             item_id=item_data.item_id,
             size_label=item_data.size_label,
             quantity=item_data.quantity,
@@ -152,87 +236,70 @@ def create_order_for_cashier(
             discount_applied=effective_discount
         )
         order_items.append(order_item)
+        items_snapshot.append(_snapshot_line(
+            order_item, item.name, item.category_obj.name if item.category_obj else ""
+        ))
 
-        item_size.stock -= item_data.quantity
+        _decrement_stock(db, item_size, item_data.quantity)
         # Inventory history for sales will be recorded after the order and items are persisted,
         # to ensure we have a valid Order Item ID in the description.
 
-    # Find the maximum numeric transaction ID and ensure it's at least 999
-    last_numeric_id = db.query(func.max(cast(Order.transaction_id, Integer)))\
-        .filter(Order.transaction_id.op('REGEXP')('^[0-9]+$')).scalar() or 0
-
-    # Start from 1000 if the max ID is less than 999
-    next_transaction_id = str(max(last_numeric_id, 999) + 1)
+    next_transaction_id = _next_transaction_id(db)
 
+    # ids are generated client-side and date/amount are set exactly as stored, so the
+    # response is built from these objects without reading the order back after commit
     new_order = Order(
-        transaction_id=next_transaction_id,
-        amount=total,
+        transaction_id=str(next_transaction_id),
+        date=datetime.now().replace(microsecond=0),
+        amount=round(total, 2),
         details=order.details,
         cashier_id=user.id,
         shopper_id=shopper_id,
-        items=order_items
+        items=order_items,
+        items_snapshot=items_snapshot
     )
     db.add(new_order)
     db.flush()
 
-    # Record inventory history entries now that OrderItem IDs exist
-    for oi in new_order.items:
-        db.add(InventoryHistory(
+    # Record inventory history entries now that OrderItem IDs exist, in a single multi-row INSERT
+    db.execute(insert(InventoryHistory), [
+        dict(
             item_id=oi.item_id,
             change=-oi.quantity,
             type=InventoryChangeType.sale,
             description=f"Sale via cashier. Order TXN: {new_order.transaction_id}. Order Item ID: {oi.id}. Size: {oi.size_label}",
             performed_by_id=user.id
-        ))
+        )
+        for oi in new_order.items
+    ])
 
     # Only create a due record if the customer is not paying (is_paid is False)
     if shopper_id and not order.is_paid:
         due = Due(
             shopper_id=shopper_id,
             order_id=new_order.id,
-            amount=total,
+            amount=new_order.amount,
             description=f"Order {next_transaction_id}"
         )
         db.add(due)
 
-    db.commit()
-    db.refresh(new_order)
-
-    order_items_response = []
-    for item in new_order.items:
-        item_details = db.query(Item).options(joinedload(Item.category_obj)).filter(Item.id == item.item_id).first()
-        category_name = ""
-        if item_details and item_details.category_obj:
-            category_name = item_details.category_obj.name
-            
-        order_items_response.append(
-            OrderItemResponse(
-                id=item.id,
-                item_id=item.item_id,
-                item_name=item_details.name if item_details else "Unknown",
-                size_label=item.size_label,
-                quantity=item.quantity,
-                price_at_purchase=item.price_at_purchase,
-                discount_applied=item.discount_applied,
-                category_name=category_name
-            )
-        )
+    order_items_response = [OrderItemResponse(**line) for line in items_snapshot]
 
     shopper_info = None
     balance_summary = None
-    if new_order.shopper_id:
-        shopper = db.query(Shopper).filter(Shopper.id == new_order.shopper_id).first()
-        if shopper:
-            shopper_info = {
-                "id": shopper.id,
-                "customer_code": shopper.customer_code,
-                "name": shopper.name,
-                "phone_number": shopper.phone_number,
-                "address": shopper.address
-            }
-        balance_summary = _compute_balances(db, new_order.shopper_id)
+    if shopper_id:
+        shopper_info = {
+            "id": shopper.id,
+            "customer_code": shopper.customer_code,
+            "name": shopper.name,
+            "phone_number": shopper.phone_number,
+            "address": shopper.address
+        }
+        # Flushed so the new due is part of the balance SUM
+        db.flush()
+        balance_summary = _compute_balances(db, shopper_id)
 
-    return OrderResponse(
+    response = OrderResponse(
         id=new_order.id,
         transaction_id=new_order.transaction_id,
         date=new_order.date,
@@ -246,6 +313,11 @@ def create_order_for_cashier(
         balance_summary=balance_summary
     )
 
+    db.commit()
+    if shopper_id:
+        invalidate_shoppers()
+    return response
+
 # Remove the existing sales endpoint
 # This has been moved to shared.py for admin/cashier access
 
@@ -253,62 +325,50 @@ def create_order_for_cashier(
 def get_order_by_identifier(
     identifier: str = Path(..., description="ID or Transaction ID of the order to retrieve"),
     db: Session = Depends(get_db),
-    token: dict = Depends(validate_cashier)
+    _: User = Depends(get_current_cashier)
 ):
     """
     Retrieve order details by order ID or transaction ID for cashier.
     """
-    username = token.get("sub")
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Cashier not found")
 
     # Find the order by ID or transaction ID
-    order = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.item).joinedload(Item.category_obj)
-    ).filter(or_(Order.id == identifier, Order.transaction_id == identifier)).first()
+    # Bound separately since the id is bound as binary and the transaction ID as text
+    order = db.execute(
+        _order_by_identifier, {"order_id": identifier, "transaction_id": identifier}
+    ).scalars().first()
 
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
     # Check if the order has been returned
-    has_been_returned = db.query(Order).filter(
-        Order.transaction_id.like(f"RETURN_{order.transaction_id}%")
-    ).first() is not None
+    has_been_returned = db.query(
+        exists().where(Order.transaction_id.like(f"RETURN_{order.transaction_id}%"))
+    ).scalar()
+
+    # Orders carry their receipt lines; only older orders need the order items joined in
+    if order.items_snapshot is not None:
+        lines = order.items_snapshot
+    else:
+        lines = [
+            _snapshot_line(
+                oi,
+                oi.item.name if oi.item else "",
+                oi.item.category_obj.name if oi.item and oi.item.category_obj else ""
+            )
+            for oi in db.query(OrderItem).filter(OrderItem.order_id == order.id)
+        ]
 
     aggregated_items = {}
-    for oi in order.items:
-        key = (oi.item_id, oi.size_label)
+    for line in lines:
+        key = (line['item_id'], line['size_label'])
         if key not in aggregated_items:
-            category_name = ""
-            if oi.item and oi.item.category_obj:
-                category_name = oi.item.category_obj.name
-            
-            aggregated_items[key] = {
-                'id': oi.id,
-                'item_id': oi.item_id,
-                'item_name': oi.item.name if oi.item else "",
-                'size_label': oi.size_label,
-                'quantity': 0,
-                'price_at_purchase': oi.price_at_purchase,
-                'discount_applied': oi.discount_applied,
-                'category_name': category_name
-            }
-        aggregated_items[key]['quantity'] += oi.quantity
+            aggregated_items[key] = dict(line, quantity=0)
+        aggregated_items[key]['quantity'] += line['quantity']
     
     # Filter out items with zero or negative quantities (fully returned)
     items_list = [item for item in aggregated_items.values() if item['quantity'] > 0]
     
-    items=[OrderItemResponse(
-        id=item['id'],
-        item_id=item['item_id'],
-        item_name=item['item_name'],
-        size_label=item['size_label'],
-        quantity=item['quantity'],
-        price_at_purchase=item['price_at_purchase'],
-        discount_applied=item['discount_applied'],
-        category_name=item['category_name']
-    ) for item in items_list]
+    items = [OrderItemResponse(**item) for item in items_list]
     
     shopper_info = None
     balance_summary = None
@@ -343,45 +403,40 @@ def process_return(
     order_id: str = Path(..., description="ID of the order"),
     return_request: ReturnRequest = Body(...),
     db: Session = Depends(get_db),
-    token: dict = Depends(validate_cashier)
+    user: User = Depends(get_current_cashier)
 ):
     """
     Process item returns for an order.
     If return_full_order is True, the entire order is returned.
     If item_returns is provided, only those specific items are returned with their quantities.
     """
-    # Get cashier user
-    username = token.get("sub")
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Cashier not found")
 
     # Find the order
-    order = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.item)
-    ).filter(Order.id == order_id).first()
+    order = db.execute(_order_by_id, {"order_id": order_id}).unique().scalars().first()
     
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
+    items_by_id = {oi.id: oi for oi in order.items}
     
     # Check if order has already been fully returned
-    return_records = db.query(Order).filter(
-        Order.transaction_id.like(f"RETURN_{order.transaction_id}%")
-    ).first()
+    has_return_records = db.query(
+        exists().where(Order.transaction_id.like(f"RETURN_{order.transaction_id}%"))
+    ).scalar()
     
-    # Also check if all items have been returned
-    all_items_returned = True
-    for order_item in order.items:
-        existing_returns = db.query(InventoryHistory).filter(
-            InventoryHistory.description.like(f"%Return%Order Item ID: {order_item.id}%")
-        ).all()
-        
-        total_returned = sum([abs(hist.change) for hist in existing_returns])
-        if total_returned < order_item.quantity:
-            all_items_returned = False
-            break
+    # Also check if all items have been returned (only possible once a return exists)
+    all_items_returned = False
+    if has_return_records:
+        all_items_returned = True
+        for order_item in order.items:
+            # MySQL returns SUM over an INT column as Decimal; the quantity math needs an int
+            total_returned = int(db.query(func.coalesce(func.sum(func.abs(InventoryHistory.change)), 0)).filter(
+                InventoryHistory.description.like(f"%Return%Order Item ID: {order_item.id}%")
+            ).scalar())
+            if total_returned < order_item.quantity:
+                all_items_returned = False
+                break
     
-    if return_records and all_items_returned:
+    if all_items_returned:
         raise HTTPException(status_code=400, detail="This order has already been fully returned and cannot be updated further.")
     
     # Extract parameters from request
@@ -393,24 +448,27 @@ def process_return(
     if return_full_order:
         # Return entire order (all items)
         # First check if the entire order has already been returned
-        existing_order_returns = db.query(InventoryHistory).filter(
-            InventoryHistory.description.like(f"%Return%Entire Order ID: {order.id}%")
-        ).first()
+        existing_order_returns = db.query(
+            exists().where(InventoryHistory.description.like(f"%Return%Entire Order ID: {order.id}%"))
+        ).scalar()
         
         if existing_order_returns:
             raise HTTPException(status_code=400, detail="This order has already been returned")
         
         returned_items = []
         return_order_items = []
+        return_order = None
+        refund_method = "cash"
+        applied_to_dues = 0.0
+        cash_refund = 0.0
+        added_to_advance = 0.0
         
         for order_item in order.items:
             # Check if this specific item has already been returned
-            existing_item_returns = db.query(InventoryHistory).filter(
+            total_item_returned = int(db.query(func.coalesce(func.sum(func.abs(InventoryHistory.change)), 0)).filter(
                 InventoryHistory.item_id == order_item.item_id,
                 InventoryHistory.description.like(f"%Return%Order Item ID: {order_item.id}%")
-            ).all()
-            
-            total_item_returned = sum([abs(hist.change) for hist in existing_item_returns])
+            ).scalar())
             
             # Only return items that haven't been fully returned
             quantity_to_return = order_item.quantity - total_item_returned
@@ -427,7 +485,7 @@ def process_return(
                     raise HTTPException(status_code=404, detail=f"Item size not found for {order_item.item.name}")
                 
                 # Update stock
-                item_size.stock += quantity_to_return
+                _apply_stock_change(db, item_size, quantity_to_return)
                 
                 # Add inventory history
                 db.add(InventoryHistory(
@@ -486,9 +544,6 @@ def process_return(
             refund_method = (return_request.refund_method or "cash").lower()
             if refund_method not in ("cash", "advance"):
                 refund_method = "cash"
-            applied_to_dues = 0.0
-            cash_refund = 0.0
-            added_to_advance = 0.0
             balances_before = _compute_balances(db, order.shopper_id) if order.shopper_id else {"dues_balance": 0.0, "advance_balance": 0.0}
 
             if order.shopper_id:
@@ -533,6 +588,8 @@ def process_return(
                 ))
         
         db.commit()
+        if order.shopper_id:
+            invalidate_shoppers()
         
         if not returned_items:
             return {
@@ -561,25 +618,29 @@ def process_return(
                     "phone_number": shopper.phone_number,
                     "address": shopper.address
                 }
-            balances_after = _compute_balances(db, order.shopper_id)
+            # The only Due rows written above are these deltas, so no need to re-aggregate
+            balances_after = {
+                "dues_balance": balances_before["dues_balance"] - applied_to_dues,
+                "advance_balance": balances_before["advance_balance"] + added_to_advance
+            }
 
         return {
             "message": f"Successfully returned entire order {order.transaction_id}",
             "receipt": {
-                "return_transaction_id": return_order.transaction_id if 'return_order' in locals() else None,
+                "return_transaction_id": return_order.transaction_id if return_order is not None else None,
                 "original_order_id": order.id,
                 "original_transaction_id": order.transaction_id,
-                "return_date": return_order.date if 'return_order' in locals() else None,
+                "return_date": return_order.date if return_order is not None else None,
                 "reason": reason,
                 "returned_items": returned_items,
                 "total_items_returned": len(returned_items),
                 "total_return_amount": total_return_amount,
                 "shopper": shopper_info,
                 "refund_allocation": {
-                    "refund_method": refund_method if 'refund_method' in locals() else "cash",
-                    "applied_to_dues": applied_to_dues if 'applied_to_dues' in locals() else 0.0,
-                    "cash_refund": cash_refund if 'cash_refund' in locals() else 0.0,
-                    "added_to_advance": added_to_advance if 'added_to_advance' in locals() else 0.0
+                    "refund_method": refund_method,
+                    "applied_to_dues": applied_to_dues,
+                    "cash_refund": cash_refund,
+                    "added_to_advance": added_to_advance
                 },
                 "balances": {
                     "before": balances_before,
@@ -593,58 +654,35 @@ def process_return(
         # Return specific items with specified quantities
         returned_items = []
         return_order_items = []
+        return_order = None
+        refund_method = "cash"
+        applied_to_dues = 0.0
+        cash_refund = 0.0
+        added_to_advance = 0.0
         total_return_amount = 0.0
         
-        # Validate all items first
+        # Validate and apply each return in a single pass; any error rolls back the whole request
         for return_item_request in item_returns:
             item_id = return_item_request.item_id
             quantity = return_item_request.quantity
             
-            # Find the order item
-            order_item = db.query(OrderItem).filter(
-                OrderItem.id == item_id,
-                OrderItem.order_id == order_id
-            ).first()
+            # Find the order item (already loaded with the order)
+            order_item = items_by_id.get(item_id)
             
             if not order_item:
                 db.rollback()
                 raise HTTPException(status_code=404, detail=f"Item {item_id} not found in order")
             
             # Check if this specific item has already been returned
-            existing_returns = db.query(InventoryHistory).filter(
+            total_returned = int(db.query(func.coalesce(func.sum(func.abs(InventoryHistory.change)), 0)).filter(
                 InventoryHistory.item_id == order_item.item_id,
                 InventoryHistory.description.like(f"%Return%Order Item ID: {order_item.id}%")
-            ).all()
-            
-            total_returned = sum([abs(hist.change) for hist in existing_returns])
+            ).scalar())
             
             # Check if return quantity is valid
             if quantity > (order_item.quantity - total_returned):
                 db.rollback()
                 raise HTTPException(status_code=400, detail=f"Return quantity exceeds remaining purchased quantity for {order_item.item.name if order_item.item else 'item'}. Already returned: {total_returned}, Requested: {quantity}, Available: {order_item.quantity - total_returned}")
-        
-        # Check if there are any items to return
-        if not item_returns:
-            return {
-                "message": "No items specified for return.",
-                "receipt": None,
-                "returned_items": [],
-                "total_items": 0
-            }
-            
-        # Process all valid returns
-        for return_item_request in item_returns:
-            item_id = return_item_request.item_id
-            quantity = return_item_request.quantity
-            
-            # Find the order item
-            order_item = db.query(OrderItem).filter(
-                OrderItem.id == item_id,
-                OrderItem.order_id == order_id
-            ).first()
-            
-            if not order_item:
-                continue  # Should not happen as we validated above
             
             # Find the item size to update stock
             item_size = db.query(ItemSize).filter(
@@ -657,7 +695,7 @@ def process_return(
                 raise HTTPException(status_code=404, detail=f"Item size not found for {order_item.item.name}")
             
             # Update stock
-            item_size.stock += quantity
+            _apply_stock_change(db, item_size, quantity)
             
             # Add inventory history
             db.add(InventoryHistory(
@@ -714,9 +752,6 @@ def process_return(
             refund_method = (return_request.refund_method or "cash").lower()
             if refund_method not in ("cash", "advance"):
                 refund_method = "cash"
-            applied_to_dues = 0.0
-            cash_refund = 0.0
-            added_to_advance = 0.0
             balances_before = _compute_balances(db, order.shopper_id) if order.shopper_id else {"dues_balance": 0.0, "advance_balance": 0.0}
 
             if order.shopper_id:
@@ -749,10 +784,12 @@ def process_return(
                 cash_refund = float(total_return_amount)
         
         db.commit()
+        if order.shopper_id:
+            invalidate_shoppers()
         
         # Get the return order details for receipt
         return_order_details = None
-        if 'return_order' in locals():
+        if return_order is not None:
             shopper_info = None
             balances_after = balances_before
             if order.shopper_id:
@@ -765,7 +802,11 @@ def process_return(
                         "phone_number": shopper.phone_number,
                         "address": shopper.address
                     }
-                balances_after = _compute_balances(db, order.shopper_id)
+                # The only Due rows written above are these deltas, so no need to re-aggregate
+                balances_after = {
+                    "dues_balance": balances_before["dues_balance"] - applied_to_dues,
+                    "advance_balance": balances_before["advance_balance"] + added_to_advance
+                }
 
             return_order_details = {
                 "return_transaction_id": return_order.transaction_id,
@@ -778,10 +819,10 @@ def process_return(
                 "total_return_amount": total_return_amount,
                 "shopper": shopper_info,
                 "refund_allocation": {
-                    "refund_method": refund_method if 'refund_method' in locals() else "cash",
-                    "applied_to_dues": applied_to_dues if 'applied_to_dues' in locals() else 0.0,
-                    "cash_refund": cash_refund if 'cash_refund' in locals() else 0.0,
-                    "added_to_advance": added_to_advance if 'added_to_advance' in locals() else 0.0
+                    "refund_method": refund_method,
+                    "applied_to_dues": applied_to_dues,
+                    "cash_refund": cash_refund,
+                    "added_to_advance": added_to_advance
                 },
                 "balances": {
                     "before": balances_before,
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, select, Date
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time
 from pydantic import BaseModel
 
 from app.db.db import get_db
@@ -25,6 +25,18 @@ class DailySalesTrendItem(BaseModel):
 class DailySalesTrendResponse(BaseModel):
     data: List[DailySalesTrendItem]
 
+def _items_per_order(range_start: datetime, range_end: datetime):
+    """Quantity sold per order for orders dated in [range_start, range_end), as a derived table."""
+    return select(
+        OrderItem.order_id,
+        func.sum(OrderItem.quantity).label('quantity')
+    ).join(
+        Order, Order.id == OrderItem.order_id
+    ).where(
+        Order.date >= range_start,
+        Order.date < range_end
+    ).group_by(OrderItem.order_id).subquery()
+
 @router.get("/daily-summary", response_model=DailySummaryResponse)
 def get_daily_summary(
     db: Session = Depends(get_db),
@@ -36,23 +48,26 @@ def get_daily_summary(
     - Average transaction value
     - Items sold count
     """
-    # Get today's date
+    # Get today's date as a half-open [start, end) range so the orders.date index is usable
     today = datetime.now().date()
+    day_start = datetime.combine(today, time.min)
+    day_end = day_start + timedelta(days=1)
     
-    # Get orders for today
-    today_orders = db.query(Order).filter(
-        func.date(Order.date) == today
-    ).all()
-    
-    # Calculate metrics
-    total_sales_amount = sum(order.amount for order in today_orders)
-    transaction_count = len(today_orders)
+    # Sales, transaction count and items sold in one round trip
+    items_per_order = _items_per_order(day_start, day_end)
+    total_sales_amount, transaction_count, items_sold_count = db.query(
+        func.coalesce(func.sum(Order.amount), 0),
+        func.count(Order.id),
+        func.coalesce(func.sum(items_per_order.c.quantity), 0)
+    ).outerjoin(
+        items_per_order, items_per_order.c.order_id == Order.id
+    ).filter(
+        Order.date >= day_start,
+        Order.date < day_end
+    ).one()
+    total_sales_amount = float(total_sales_amount)
     average_transaction_value = total_sales_amount / transaction_count if transaction_count > 0 else 0
-    
-    # Calculate items sold count
-    items_sold_count = 0
-    for order in today_orders:
-        items_sold_count += sum(item.quantity for item in order.items)
+    items_sold_count = int(items_sold_count)
     
     return DailySummaryResponse(
         total_sales_amount=total_sales_amount,
@@ -71,49 +86,41 @@ def get_daily_sales_trend(
     # Get today's date and 6 days before (7 days total)
     today = datetime.now().date()
     start_date = today - timedelta(days=6)
+    dates = [start_date + timedelta(days=i) for i in range(7)]
+    # Half-open datetime range over the 7 days so the orders.date index is usable
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(today, time.min) + timedelta(days=1)
     
-    # Query to get sales data grouped by day for the last 7 days
+    # Sales, transaction count and items sold per day for the last 7 days in one query
+    items_per_order = _items_per_order(range_start, range_end)
     sales_data = db.query(
-        func.date(Order.date).label('order_date'),
+        func.date(Order.date, type_=Date).label('order_date'),
         func.sum(Order.amount).label('total_sales'),
-        func.count(Order.id).label('transaction_count')
+        func.count(Order.id).label('transaction_count'),
+        func.coalesce(func.sum(items_per_order.c.quantity), 0).label('items_sold')
+    ).outerjoin(
+        items_per_order, items_per_order.c.order_id == Order.id
     ).filter(
-        func.date(Order.date) >= start_date,
-        func.date(Order.date) <= today
+        Order.date >= range_start,
+        Order.date < range_end
     ).group_by(
         func.date(Order.date)
-    ).order_by(
-        func.date(Order.date)
     ).all()
+    sales_by_date = {
+        row.order_date: (float(row.total_sales), row.transaction_count, int(row.items_sold))
+        for row in sales_data
+    }
     
-    # Get items sold count for each day
-    items_sold_data = {}
-    for i in range(7):
-        day_date = start_date + timedelta(days=i)
-        day_orders = db.query(Order).options(joinedload(Order.items)).filter(
-            func.date(Order.date) == day_date
-        ).all()
-        
-        items_count = 0
-        for order in day_orders:
-            items_count += sum(item.quantity for item in order.items)
-        
-        items_sold_data[day_date] = items_count
-    
-    # Format response
-    trend_data = []
-    for i in range(7):
-        day_date = start_date + timedelta(days=i)
-        day_str = day_date.strftime('%Y-%m-%d')
-        
-        # Find data for this day
-        day_sales = next((data for data in sales_data if data.order_date == day_date), None)
-        
-        trend_data.append(DailySalesTrendItem(
-            date=day_str,
-            total_sales=float(day_sales.total_sales) if day_sales else 0.0,
-            transaction_count=day_sales.transaction_count if day_sales else 0,
-            items_sold=items_sold_data.get(day_date, 0)
-        ))
+    # Format response, filling days without sales with zeros
+    no_sales = (0.0, 0, 0)
+    trend_data = [
+        DailySalesTrendItem(
+            date=day_date.isoformat(),
+            total_sales=sales_by_date.get(day_date, no_sales)[0],
+            transaction_count=sales_by_date.get(day_date, no_sales)[1],
+            items_sold=sales_by_date.get(day_date, no_sales)[2]
+        )
+        for day_date in dates
+    ]
     
     return DailySalesTrendResponse(data=trend_data)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.exc import IntegrityError
 from typing import List
-from sqlalchemy.sql import func
 from app.db.db import get_db
 from app.db.models import Category, Item
 from app.api.schemas.category import (
@@ -20,21 +20,17 @@ def create_category(
     """
     Create a new category.
     """
-    # Check if category with this name already exists
-    db_category = db.query(Category).filter(
-        func.lower(Category.name) == func.lower(category.name)
-    ).first()
-    
-    if db_category:
+    db_category = Category(**category.dict())
+    db.add(db_category)
+    # The case-insensitive unique index on name rejects duplicates
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A category with this name already exists"
         )
-    
-    db_category = Category(**category.dict())
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
     return db_category
 
 @router.get("/", response_model=List[CategoryResponse])
@@ -57,26 +53,17 @@ def get_category(
     """
     Get a specific category by ID, including its items.
     """
-    db_category = db.query(Category).filter(Category.id == category_id).first()
+    # Items are batch-loaded with the category; their category_obj resolves from the identity map
+    db_category = db.query(Category).options(
+        selectinload(Category.items).lazyload(Item.category_obj)
+    ).filter(Category.id == category_id).first()
     if not db_category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
     
-    # Get items for this category
-    items = db.query(Item).filter(Item.category_id == category_id).all()
-    
-    # Convert to dict to avoid SQLAlchemy serialization issues
-    category_data = {
-        **db_category.__dict__,
-        "items": [
-            {"id": item.id, "name": item.name, "created_at": item.created_at}
-            for item in items
-        ]
-    }
-    
-    return category_data
+    return CategoryWithItems.model_validate(db_category)
 
 @router.put("/{category_id}", response_model=CategoryResponse)
 def update_category(
@@ -95,23 +82,17 @@ def update_category(
             detail="Category not found"
         )
     
-    # Check if new name is already taken by another category
-    if category.name and category.name.lower() != db_category.name.lower():
-        existing_category = db.query(Category).filter(
-            func.lower(Category.name) == func.lower(category.name),
-            Category.id != category_id
-        ).first()
-        
-        if existing_category:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="A category with this name already exists"
-            )
-    
     # Update fields
     for field, value in category.dict(exclude_unset=True).items():
         setattr(db_category, field, value)
     
-    db.commit()
-    db.refresh(db_category)
+    # A name already taken by another category violates the unique index
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A category with this name already exists"
+        )
     return db_category
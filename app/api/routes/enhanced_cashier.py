@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, cast, Integer
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, joinedload, selectinload, raiseload, undefer
+from sqlalchemy import func, tuple_, insert
 from typing import Optional
+from datetime import datetime
 from pydantic import BaseModel
 from app.core.security import validate_admin_or_cashier
 
 from app.db.db import get_db
-from app.db.models import Item, ItemSize, Category, Due, Order, OrderItem, InventoryHistory, InventoryChangeType, User, Shopper
+from app.db.models import Item, ItemSize, Category, Due, Order, OrderItem, InventoryHistory, InventoryChangeType, User, Shopper, generate_id
 from app.api.schemas.enhanced_order import EnhancedOrderCreate, EnhancedOrderResponse, CashierInfo, ShopperInfo
 from app.api.schemas.order import OrderItemResponse
-from app.api.routes.cashier import validate_cashier
+from app.api.routes.cashier import validate_cashier, get_current_cashier, _decrement_stock, _next_transaction_id, _snapshot_line
+from app.api.routes.shared import _order_keyset_page, _cursor_headers, _json_array_response
+from app.core.cache import invalidate_shoppers
 
 router = APIRouter()
 
@@ -17,7 +20,7 @@ router = APIRouter()
 def create_enhanced_order_for_cashier(
     order: EnhancedOrderCreate,
     db: Session = Depends(get_db),
-    token: dict = Depends(validate_cashier)
+    user: User = Depends(get_current_cashier)
 ):
     """
     Create a new order with enhanced payment handling.
@@ -26,31 +29,44 @@ def create_enhanced_order_for_cashier(
     - Payments toward previous dues
     - Advance payments
     """
-    username = token.get("sub")
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Cashier not found")
+    # Build response info now; ORM objects expire on commit and would be re-selected
+    cashier_info = CashierInfo(id=user.id, username=user.username)
 
     shopper_id = None
     shopper = None
+    shopper_info = None
     if order.customer_code:
         shopper = db.query(Shopper).filter(Shopper.customer_code == order.customer_code).first()
         if not shopper:
             raise HTTPException(status_code=404, detail=f"Shopper with code {order.customer_code} not found")
         shopper_id = shopper.id
+        shopper_info = ShopperInfo(
+            id=shopper.id,
+            customer_code=shopper.customer_code,
+            name=shopper.name,
+            phone_number=shopper.phone_number,
+            address=shopper.address
+        )
 
     # Calculate order total
     total = 0.0
     order_items = []
+    # Receipt lines, stored on the order and used for the response
+    items_snapshot = []
+    # Load every requested (item_id, size_label) in one query instead of one per line
+    requested_sizes = list({(item_data.item_id, item_data.size_label) for item_data in order.items})
+    sizes_by_key = {}
+    if requested_sizes:
+        sizes_by_key = {
+            (size.item_id, size.size_label): size
+            for size in db.query(ItemSize).options(joinedload(ItemSize.item)).filter(
+                tuple_(ItemSize.item_id, ItemSize.size_label).in_(requested_sizes)
+            )
+        }
     for item_data in order.items:
-        item_size = db.query(ItemSize).options(joinedload(ItemSize.item).joinedload(Item.category_obj)).filter(
-            ItemSize.item_id == item_data.item_id,
-            ItemSize.size_label == item_data.size_label
-        ).first()
+        item_size = sizes_by_key.get((item_data.item_id, item_data.size_label))
         if not item_size:
             raise HTTPException(status_code=404, detail=f"Item with ID {item_data.item_id} and size {item_data.size_label} not found")
-        if item_size.stock < item_data.quantity:
-            raise HTTPException(status_code=400, detail=f"Not enough stock for {item_size.item.name} ({item_data.size_label})")
 
         category_discount = item_size.item.category_obj.discount if item_size.item.category_obj else None
         effective_discount = category_discount if category_discount is not None and category_discount > 0 else (item_size.discount or 0.0)
@@ -59,6 +75,7 @@ def create_enhanced_order_for_cashier(
         total += price_after_discount * item_data.quantity
 
         order_item = OrderItem(
+            id=generate_id(),
             item_id=item_data.item_id,
             size_label=item_data.size_label,
             quantity=item_data.quantity,
@@ -66,41 +83,52 @@ def create_enhanced_order_for_cashier(
             discount_applied=effective_discount
         )
         order_items.append(order_item)
+        items_snapshot.append(_snapshot_line(
+            order_item,
+            item_size.item.name,
+            item_size.item.category_obj.name if item_size.item.category_obj else "Uncategorized"
+        ))
 
         # Update inventory
-        item_size.stock -= item_data.quantity
+        _decrement_stock(db, item_size, item_data.quantity)
         # Defer inventory history creation until after flush so OrderItem IDs exist
 
     # Generate transaction ID
-    last_numeric_id = db.query(func.max(cast(Order.transaction_id, Integer)))\
-        .filter(Order.transaction_id.op('REGEXP')('^[0-9]+$')).scalar() or 0
-    next_transaction_id = str(max(last_numeric_id, 999) + 1)
+    next_transaction_id = _next_transaction_id(db)
 
-    # Create the order
+    # Create the order. ids are generated client-side and date/amount are set exactly as
+    # stored, so the response is built from these objects without reading the order back
     new_order = Order(
-        transaction_id=next_transaction_id,
-        amount=total,
+        transaction_id=str(next_transaction_id),
+        date=datetime.now().replace(microsecond=0),
+        amount=round(total, 2),
         details=order.details,
         cashier_id=user.id,
         shopper_id=shopper_id,
-        items=order_items
+        items=order_items,
+        items_snapshot=items_snapshot
     )
     db.add(new_order)
     db.flush()
 
     # Now that OrderItem IDs exist, record inventory history entries with full context
-    for oi in new_order.items:
-        db.add(InventoryHistory(
+    # in a single multi-row INSERT
+    db.execute(insert(InventoryHistory), [
+        dict(
             item_id=oi.item_id,
             change=-oi.quantity,
             type=InventoryChangeType.sale,
             description=f"Sale via cashier. Order TXN: {new_order.transaction_id}. Order Item ID: {oi.id}. Size: {oi.size_label}",
             performed_by_id=user.id
-        ))
+        )
+        for oi in new_order.items
+    ])
 
     # Handle payment logic if customer code is provided
     remaining_dues = 0.0
     remaining_order_balance = 0.0
+    created_positive_due = False
+    new_dues = []
     
     if shopper_id and order.payment_amount is not None and order.payment_breakdown is not None:
         # Use frontend-calculated payment breakdown
@@ -117,8 +145,8 @@ def create_enhanced_order_for_cashier(
             raise HTTPException(status_code=400, detail="Payment breakdown does not match payment amount")
         
         # Validate that remaining values are consistent
-        previous_dues = db.query(Due).filter(Due.shopper_id == shopper_id).all()
-        total_previous_dues = sum(due.amount for due in previous_dues)
+        total_previous_dues = db.query(func.coalesce(func.sum(Due.amount), 0.0))\
+            .filter(Due.shopper_id == shopper_id).scalar()
         
         # Only consider positive dues (actual debts) for validation
         # Negative dues represent existing advance payments
@@ -142,99 +170,65 @@ def create_enhanced_order_for_cashier(
         # Handle advance credit usage if provided in payment breakdown
         credit_used = getattr(order.payment_breakdown, 'credit_used', 0.0)
         if credit_used > 0:
-            credit_usage_due = Due(
+            new_dues.append(dict(
                 shopper_id=shopper_id,
                 order_id=new_order.id,
                 amount=credit_used,  # Positive to reduce the negative advance balance
                 description=f"Using advance credit for Order {next_transaction_id}"
-            )
-            db.add(credit_usage_due)
+            ))
+            created_positive_due = True
         
         # Create due records for payment toward previous dues
         if dues_payment > 0:
-            payment_due = Due(
+            new_dues.append(dict(
                 shopper_id=shopper_id,
                 order_id=new_order.id,
                 amount=-dues_payment,  # Negative for payment
                 description=f"Payment toward previous dues for Order {next_transaction_id}"
-            )
-            db.add(payment_due)
+            ))
         
         # Create due record for remaining order balance if not fully paid
         if remaining_order_balance > 0:
-            remaining_due = Due(
+            new_dues.append(dict(
                 shopper_id=shopper_id,
                 order_id=new_order.id,
                 amount=remaining_order_balance,
                 description=f"Remaining balance for Order {next_transaction_id}"
-            )
-            db.add(remaining_due)
+            ))
+            created_positive_due = True
         
         # Handle advance payment (when payment exceeds order total + previous dues)
         if advance_payment > 0:
-            advance_due = Due(
+            new_dues.append(dict(
                 shopper_id=shopper_id,
                 order_id=new_order.id,
                 amount=-advance_payment,  # Negative for advance payment
                 description=f"Advance payment for future purchases. Order {next_transaction_id}"
-            )
-            db.add(advance_due)
+            ))
         
         # If fully paid, no need to create a due for the order
     elif shopper_id and not order.is_paid:
         # Fallback to original logic if no payment amount provided
-        due = Due(
+        new_dues.append(dict(
             shopper_id=shopper_id,
             order_id=new_order.id,
-            amount=total,
+            amount=new_order.amount,
             description=f"Order {next_transaction_id}"
-        )
-        db.add(due)
+        ))
+        created_positive_due = total > 0
 
-    db.commit()
-    db.refresh(new_order)
+    # Write all due records for this order in one INSERT
+    if new_dues:
+        db.execute(insert(Due), new_dues)
 
-    # Determine is_paid status based on whether there's a due record for this order
-    # Order is considered paid if all due records are negative (payments/credits) or there are no dues
-    order_dues = db.query(Due).filter(Due.order_id == new_order.id).all()
-    order_is_paid = all(due.amount <= 0 for due in order_dues) if order_dues else True
+    # Order is considered paid if all its due records are negative (payments/credits) or there are no dues
+    order_is_paid = not created_positive_due
     
     # Prepare order items response
-    order_items_response = []
-    for item in new_order.items:
-        item_details = db.query(Item).options(joinedload(Item.category_obj)).filter(Item.id == item.item_id).first()
-        order_items_response.append(
-            OrderItemResponse(
-                id=item.id,
-                item_id=item.item_id,
-                item_name=item_details.name if item_details else "Unknown",
-                size_label=item.size_label,
-                quantity=item.quantity,
-                price_at_purchase=item.price_at_purchase,
-                discount_applied=item.discount_applied,
-                category_name=item_details.category_obj.name if item_details and item_details.category_obj else "Uncategorized"
-            )
-        )
-    
-    # Get cashier details
-    cashier = db.query(User).filter(User.id == new_order.cashier_id).first()
-    cashier_info = CashierInfo(id=cashier.id, username=cashier.username) if cashier else None
-    
-    # Get shopper details if shopper exists
-    shopper_info = None
-    if shopper_id:
-        shopper = db.query(Shopper).filter(Shopper.id == shopper_id).first()
-        if shopper:
-            shopper_info = ShopperInfo(
-                id=shopper.id,
-                customer_code=shopper.customer_code,
-                name=shopper.name,
-                phone_number=shopper.phone_number,
-                address=shopper.address
-            )
+    order_items_response = [OrderItemResponse(**line) for line in items_snapshot]
     
     # Prepare response
-    return EnhancedOrderResponse(
+    response = EnhancedOrderResponse(
         id=new_order.id,
         transaction_id=new_order.transaction_id,
         date=new_order.date,
@@ -252,82 +246,103 @@ def create_enhanced_order_for_cashier(
         shopper=shopper_info
     )
 
+    db.commit()
+    if new_dues:
+        invalidate_shoppers()
+    return response
+
+
+def _sales_list_body(order: Order, unpaid_order_ids: set) -> dict:
+    """Response body for one order of the enhanced sales list.
+    Rows come straight from the database, so it is built with model_construct, skipping
+    per-field validation and FastAPI's response_model pass.
+    """
+    # Get cashier info
+    cashier_info = CashierInfo.model_construct(
+        id=order.cashier.id,
+        username=order.cashier.username
+    ) if order.cashier else None
+    
+    # Get shopper info
+    shopper_info = ShopperInfo.model_construct(
+        id=order.shopper.id,
+        customer_code=order.shopper.customer_code,
+        name=order.shopper.name,
+        phone_number=order.shopper.phone_number,
+        address=order.shopper.address
+    ) if order.shopper else None
+    
+    # Build order items with item names
+    order_items = []
+    for item in order.items:
+        order_item = OrderItemResponse.model_construct(
+            id=item.id,
+            item_id=item.item_id,
+            item_name=item.item.name if item.item else "Unknown Item",
+            size_label=item.size_label,
+            quantity=item.quantity,
+            price_at_purchase=item.price_at_purchase,
+            discount_applied=item.discount_applied,
+            category_name=item.item.category_obj.name if item.item and item.item.category_obj else "Uncategorized"
+        )
+        order_items.append(order_item)
+    
+    # Determine is_paid status based on whether there's a due record for this order
+    is_paid = order.id not in unpaid_order_ids
+    
+    # Create enhanced order response
+    enhanced_order = EnhancedOrderResponse.model_construct(
+        id=order.id,
+        transaction_id=order.transaction_id,
+        date=order.date,
+        amount=order.amount,
+        details=order.details,
+        cashier_id=order.cashier_id,
+        shopper_id=order.shopper_id,
+        items=order_items,
+        is_paid=is_paid,
+        payment_amount=None,
+        payment_breakdown=None,
+        remaining_dues=None,
+        remaining_order_balance=None,
+        cashier=cashier_info,
+        shopper=shopper_info
+    )
+    return enhanced_order.model_dump()
 
 @router.get("/orders/enhanced/sales", response_model=list[EnhancedOrderResponse])
 def get_enhanced_sales_list(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     token: dict = Depends(validate_admin_or_cashier)
 ):
     """
-    Retrieve all sales (orders) with enhanced details including shopper and cashier information
+    Retrieve sales (orders), newest first and paginated by cursor, with enhanced details
+    including shopper and cashier information
     Accessible to both admin and cashier roles
     """
     orders = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.item).joinedload(Item.category_obj),
-        joinedload(Order.cashier),
-        joinedload(Order.shopper)
-    ).all()
+        selectinload(Order.items).selectinload(OrderItem.item).joinedload(Item.category_obj),
+        selectinload(Order.cashier),
+        selectinload(Order.shopper),
+        raiseload('*')
+    )
+    orders, next_cursor = _order_keyset_page(orders, limit, cursor)
     
-    response_items = []
-    for order in orders:
-        # Get cashier info
-        cashier_info = CashierInfo(
-            id=order.cashier.id,
-            username=order.cashier.username
-        ) if order.cashier else None
-        
-        # Get shopper info
-        shopper_info = ShopperInfo(
-            id=order.shopper.id,
-            customer_code=order.shopper.customer_code,
-            name=order.shopper.name,
-            phone_number=order.shopper.phone_number,
-            address=order.shopper.address
-        ) if order.shopper else None
-        
-        # Build order items with item names
-        order_items = []
-        for item in order.items:
-            order_item = OrderItemResponse(
-                id=item.id,
-                order_id=item.order_id,
-                item_id=item.item_id,
-                item_name=item.item.name if item.item else "Unknown Item",
-                size_label=item.size_label,
-                quantity=item.quantity,
-                price_at_purchase=item.price_at_purchase,
-                discount_applied=item.discount_applied,
-                category_name=item.item.category_obj.name if item.item and item.item.category_obj else "Uncategorized"
-            )
-            order_items.append(order_item)
-        
-        # Determine is_paid status based on whether there's a due record for this order
-        is_paid = True
-        if order.shopper_id:
-            due_record = db.query(Due).filter(Due.order_id == order.id, Due.amount > 0).first()
-            is_paid = due_record is None
-        
-        # Create enhanced order response
-        enhanced_order = EnhancedOrderResponse(
-            id=order.id,
-            transaction_id=order.transaction_id,
-            date=order.date,
-            amount=order.amount,
-            details=order.details,
-            cashier_id=order.cashier_id,
-            shopper_id=order.shopper_id,
-            items=order_items,
-            is_paid=is_paid,
-            payment_amount=None,
-            payment_breakdown=None,
-            remaining_dues=None,
-            remaining_order_balance=None,
-            cashier=cashier_info,
-            shopper=shopper_info
-        )
-        response_items.append(enhanced_order)
+    # Orders with an outstanding (positive) due, fetched once instead of per order
+    shopper_order_ids = [order.id for order in orders if order.shopper_id]
+    unpaid_order_ids = set()
+    if shopper_order_ids:
+        unpaid_order_ids = {
+            row.order_id for row in db.query(Due.order_id).filter(
+                Due.order_id.in_(shopper_order_ids),
+                Due.amount > 0
+            ).distinct()
+        }
     
-    return response_items
+    bodies = [_sales_list_body(order, unpaid_order_ids) for order in orders]
+    return _json_array_response(bodies, headers=_cursor_headers(next_cursor))
 
 @router.get("/orders/{order_id}", response_model=EnhancedOrderResponse)
 def get_enhanced_order_by_id(
@@ -338,43 +353,49 @@ def get_enhanced_order_by_id(
     """
     Get an order by ID with enhanced details including shopper and cashier information
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).options(
+        undefer(Order.items_snapshot),
+        selectinload(Order.cashier),
+        selectinload(Order.shopper),
+        raiseload('*')
+    ).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Get order items with item details
-    order_items_response = []
-    for item in order.items:
-        item_details = db.query(Item).options(joinedload(Item.category_obj)).filter(Item.id == item.item_id).first()
-        order_items_response.append(
-            OrderItemResponse(
-                id=item.id,
-                item_id=item.item_id,
-                item_name=item_details.name if item_details else "Unknown",
-                size_label=item.size_label,
-                quantity=item.quantity,
-                price_at_purchase=item.price_at_purchase,
-                discount_applied=item.discount_applied,
-                category_name=item_details.category_obj.name if item_details and item_details.category_obj else "Uncategorized"
+    # Orders carry their receipt lines; only older orders need the order items loaded
+    if order.items_snapshot is not None:
+        order_items_response = [OrderItemResponse(**line) for line in order.items_snapshot]
+    else:
+        order_items_response = []
+        for item in db.query(OrderItem).options(
+            selectinload(OrderItem.item).joinedload(Item.category_obj)
+        ).filter(OrderItem.order_id == order.id):
+            order_items_response.append(
+                OrderItemResponse(
+                    id=item.id,
+                    item_id=item.item_id,
+                    item_name=item.item.name if item.item else "Unknown",
+                    size_label=item.size_label,
+                    quantity=item.quantity,
+                    price_at_purchase=item.price_at_purchase,
+                    discount_applied=item.discount_applied,
+                    category_name=item.item.category_obj.name if item.item and item.item.category_obj else "Uncategorized"
+                )
             )
-        )
     
     # Get cashier details
-    cashier = db.query(User).filter(User.id == order.cashier_id).first()
-    cashier_info = CashierInfo(id=cashier.id, username=cashier.username) if cashier else None
+    cashier_info = CashierInfo(id=order.cashier.id, username=order.cashier.username) if order.cashier else None
     
     # Get shopper details if shopper exists
     shopper_info = None
-    if order.shopper_id:
-        shopper = db.query(Shopper).filter(Shopper.id == order.shopper_id).first()
-        if shopper:
-            shopper_info = ShopperInfo(
-                id=shopper.id,
-                customer_code=shopper.customer_code,
-                name=shopper.name,
-                phone_number=shopper.phone_number,
-                address=shopper.address
-            )
+    if order.shopper:
+        shopper_info = ShopperInfo(
+            id=order.shopper.id,
+            customer_code=order.shopper.customer_code,
+            name=order.shopper.name,
+            phone_number=order.shopper.phone_number,
+            address=order.shopper.address
+        )
     
     # Determine is_paid status based on whether there's a due record for this order
     is_paid = True
@@ -1,49 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload, noload, raiseload
+from sqlalchemy import select, tuple_, literal
+from typing import List, Optional
+import orjson
 
 from app.db.db import get_db
-from app.db.models import Order, OrderItem
+from app.db.models import Order, OrderItem, Item
 from app.api.schemas.order import OrderResponse
 from app.core.security import validate_admin_or_cashier
 
 router = APIRouter(prefix="/shared_role", tags=["Shared Admin-Cashier"])
 
+def _order_keyset_page(query, limit: int, cursor: Optional[str]):
+    """Return one newest-first page of orders, starting after the order whose id is `cursor`,
+    and the cursor for the following page (None on the last page).
+    Keyed on (date, id) so paging walks the orders.date index instead of an OFFSET scan.
+    An unknown cursor is a 400, so it can't be mistaken for an empty last page.
+    """
+    if cursor:
+        cursor_date = query.session.execute(select(Order.date).where(Order.id == cursor)).scalar()
+        if cursor_date is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            tuple_(Order.date, Order.id) < tuple_(literal(cursor_date, Order.date.type), literal(cursor, Order.id.type))
+        )
+    orders = query.order_by(Order.date.desc(), Order.id.desc()).limit(limit).all()
+    next_cursor = orders[-1].id if len(orders) == limit else None
+    return orders, next_cursor
+
+def _cursor_headers(next_cursor: Optional[str]):
+    """The next page's cursor is sent in the X-Next-Cursor header (absent on the last page)."""
+    return {"X-Next-Cursor": next_cursor} if next_cursor else None
+
+def _json_array_response(bodies: List[dict], headers: Optional[dict] = None):
+    """Stream a JSON array of already built bodies, encoding one element at a time.
+    Avoids holding the whole encoded array in memory for large pages. The bodies are built
+    (and validated) by the caller before this returns, while the session is still open and
+    an error can still become a proper error response; once streaming starts the status
+    has been sent.
+    """
+    def encode():
+        yield b"["
+        for i, body in enumerate(bodies):
+            yield orjson.dumps(body) if i == 0 else b"," + orjson.dumps(body)
+        yield b"]"
+    return StreamingResponse(encode(), media_type="application/json", headers=headers)
+
 @router.get("/sales", response_model=List[OrderResponse])
 def get_sales_list(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     _: dict = Depends(validate_admin_or_cashier)
 ):
     """
-    Retrieve all sales (orders) without pagination
+    Retrieve sales (orders), newest first, paginated by cursor
     Accessible to both admin and cashier roles
     """
+    # Everything the response reads is loaded up front; the shopper is not part of this listing
     orders = db.query(Order).options(
-        joinedload(Order.items).joinedload(OrderItem.item)
-    ).all()
-    
-    response_items = []
-    for order in orders:
-        order_data = {
-            "id": order.id,
-            "transaction_id": order.transaction_id,
-            "date": order.date,
-            "amount": order.amount,
-            "details": order.details,
-            "cashier_id": order.cashier_id,
-            "items": []
-        }
-        for item in order.items:
-            item_data = {
-                "id": item.id,
-                "item_id": item.item_id,
-                "item_name": item.item.name,
-                "size_label": item.size_label,
-                "quantity": item.quantity,
-                "price_at_purchase": item.price_at_purchase,
-                "discount_applied": item.discount_applied
-            }
-            order_data["items"].append(item_data)
-        response_items.append(OrderResponse(**order_data))
+        selectinload(Order.items).selectinload(OrderItem.item).joinedload(Item.category_obj),
+        noload(Order.shopper),
+        raiseload('*')
+    )
+    orders, next_cursor = _order_keyset_page(orders, limit, cursor)
     
-    return response_items
+    # Validated once per order before anything is sent; returning the response directly
+    # skips FastAPI's second pass over response_model
+    bodies = [OrderResponse.model_validate(order).model_dump() for order in orders]
+    return _json_array_response(bodies, headers=_cursor_headers(next_cursor))
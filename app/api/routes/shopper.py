@@ -1,53 +1,164 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, selectinload, raiseload
 from typing import List
+from datetime import datetime
+from collections import defaultdict
 
 from app.db import models
 from app.api.schemas import shopper as shopper_schemas
 from app.api.schemas import customer_history as history_schemas
 from app.db.db import get_db
-from sqlalchemy import func
+from app.core.cache import get_shopper_cache, set_shopper_cache, invalidate_shoppers, SHOPPER_LIST_TTL, SHOPPER_TTL
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# The endpoints below return ORJSONResponse directly, so FastAPI skips re-encoding and
+# re-validating against response_model (kept for the OpenAPI schema). Bodies are built
+# with model_construct since the ORM rows are already valid.
+def _due_body(due: models.Due) -> shopper_schemas.DueResponse:
+    return shopper_schemas.DueResponse.model_construct(
+        id=due.id,
+        shopper_id=due.shopper_id,
+        order_id=due.order_id,
+        amount=due.amount,
+        description=due.description,
+        created_at=due.created_at
+    )
+
+def _shopper_body(shopper: models.Shopper) -> shopper_schemas.ShopperResponse:
+    return shopper_schemas.ShopperResponse.model_construct(
+        id=shopper.id,
+        customer_code=shopper.customer_code,
+        name=shopper.name,
+        phone_number=shopper.phone_number,
+        address=shopper.address,
+        created_at=shopper.created_at,
+        dues=[_due_body(due) for due in shopper.dues]
+    )
+
+# Columns of ShopperResponse / DueResponse, for endpoints that read rows as mappings
+_SHOPPER_COLUMNS = (
+    models.Shopper.id,
+    models.Shopper.customer_code,
+    models.Shopper.name,
+    models.Shopper.phone_number,
+    models.Shopper.address,
+    models.Shopper.created_at
+)
+_DUE_COLUMNS = (
+    models.Due.id,
+    models.Due.shopper_id,
+    models.Due.order_id,
+    models.Due.amount,
+    models.Due.description,
+    models.Due.created_at
+)
 
 @router.post("/", response_model=shopper_schemas.ShopperResponse, status_code=status.HTTP_201_CREATED)
 def create_shopper(shopper: shopper_schemas.ShopperCreate, db: Session = Depends(get_db)):
-    db_shopper = db.query(models.Shopper).filter(models.Shopper.customer_code == shopper.customer_code).first()
-    if db_shopper:
-        raise HTTPException(status_code=400, detail="Shopper with this customer code already exists")
-    
-    new_shopper = models.Shopper(**shopper.dict())
+    # created_at is set here and the (empty) dues collection initialized so the response
+    # can be built from the flushed row without re-selecting it after commit
+    new_shopper = models.Shopper(**shopper.dict(), created_at=datetime.now().replace(microsecond=0), dues=[])
     db.add(new_shopper)
-    db.commit()
-    db.refresh(new_shopper)
-    return new_shopper
+    # The unique index on customer_code rejects duplicates
+    try:
+        db.flush()
+        body = _shopper_body(new_shopper).model_dump()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Shopper with this customer code already exists")
+    invalidate_shoppers()
+    return ORJSONResponse(body, status_code=status.HTTP_201_CREATED)
 
 @router.get("/", response_model=List[shopper_schemas.ShopperResponse])
 def get_all_shoppers(db: Session = Depends(get_db)):
-    shoppers = db.query(models.Shopper).all()
-    return shoppers
+    cache_key, cached = get_shopper_cache("all")
+    if cached is not None:
+        return Response(cached, media_type="application/json")
+
+    # Plain row mappings instead of ORM instances: two queries in total, and the dues
+    # are grouped per shopper in Python
+    shoppers = db.execute(select(*_SHOPPER_COLUMNS)).mappings().all()
+    dues_by_shopper = defaultdict(list)
+    if shoppers:
+        dues = db.execute(
+            select(*_DUE_COLUMNS).where(models.Due.shopper_id.in_([shopper["id"] for shopper in shoppers]))
+        ).mappings()
+        for due in dues:
+            dues_by_shopper[due["shopper_id"]].append(dict(due))
+    response = ORJSONResponse([
+        dict(shopper, dues=dues_by_shopper[shopper["id"]]) for shopper in shoppers
+    ])
+    set_shopper_cache(cache_key, response.body, SHOPPER_LIST_TTL)
+    return response
 
 @router.get("/{customer_code}", response_model=shopper_schemas.ShopperResponse)
 def get_shopper_by_code(customer_code: str, db: Session = Depends(get_db)):
-    db_shopper = db.query(models.Shopper).filter(models.Shopper.customer_code == customer_code).first()
+    cache_key, cached = get_shopper_cache(f"code:{customer_code}")
+    if cached is not None:
+        return Response(cached, media_type="application/json")
+
+    db_shopper = db.query(models.Shopper).options(
+        selectinload(models.Shopper.dues)
+    ).filter(models.Shopper.customer_code == customer_code).first()
     if not db_shopper:
         raise HTTPException(status_code=404, detail="Shopper not found")
-    return db_shopper
+    response = ORJSONResponse(_shopper_body(db_shopper).model_dump())
+    set_shopper_cache(cache_key, response.body, SHOPPER_TTL)
+    return response
 
 @router.post("/{customer_code}/transactions", response_model=shopper_schemas.DueResponse, status_code=status.HTTP_201_CREATED)
 def add_due_or_payment(customer_code: str, due: shopper_schemas.DueBase, db: Session = Depends(get_db)):
-    db_shopper = db.query(models.Shopper).filter(models.Shopper.customer_code == customer_code).first()
-    if not db_shopper:
+    shopper_id = db.query(models.Shopper.id).filter(models.Shopper.customer_code == customer_code).scalar()
+    if not shopper_id:
         raise HTTPException(status_code=404, detail="Shopper not found")
 
     new_due = models.Due(
         **due.dict(),
-        shopper_id=db_shopper.id
+        shopper_id=shopper_id,
+        created_at=datetime.now().replace(microsecond=0)
     )
     db.add(new_due)
+    db.flush()
+    # Built before commit, which would expire the row and force a re-select
+    body = _due_body(new_due).model_dump()
+    db.commit()
+    invalidate_shoppers()
+    return ORJSONResponse(body, status_code=status.HTTP_201_CREATED)
+
+@router.post("/{customer_code}/transactions/bulk", response_model=List[shopper_schemas.DueResponse], status_code=status.HTTP_201_CREATED)
+def add_dues_or_payments_bulk(customer_code: str, dues: List[shopper_schemas.DueBase], db: Session = Depends(get_db)):
+    shopper_id = db.query(models.Shopper.id).filter(models.Shopper.customer_code == customer_code).scalar()
+    if not shopper_id:
+        raise HTTPException(status_code=404, detail="Shopper not found")
+    if not dues:
+        return ORJSONResponse([], status_code=status.HTTP_201_CREATED)
+
+    # ids and created_at are set here so the whole batch goes out as one multi-row INSERT
+    # and the response can be built without reading the rows back
+    created_at = datetime.now().replace(microsecond=0)
+    rows = [
+        dict(
+            id=models.generate_id(),
+            shopper_id=shopper_id,
+            order_id=None,
+            amount=due.amount,
+            description=due.description,
+            created_at=created_at
+        )
+        for due in dues
+    ]
+    db.execute(insert(models.Due), rows)
     db.commit()
-    db.refresh(new_due)
-    return new_due
+    invalidate_shoppers()
+    return ORJSONResponse(
+        [shopper_schemas.DueResponse.model_construct(**row).model_dump() for row in rows],
+        status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("/{customer_code}/history", response_model=history_schemas.CustomerHistoryResponse)
@@ -57,20 +168,28 @@ def get_customer_history(customer_code: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Shopper not found")
 
     # Get all orders for this shopper
-    orders = db.query(models.Order).filter(models.Order.shopper_id == db_shopper.id).all()
+    orders = db.query(models.Order).options(
+        # Only the item name is shown, so skip the rest of the item row and its category join
+        selectinload(models.Order.items).selectinload(models.OrderItem.item)
+            .load_only(models.Item.name).raiseload(models.Item.category_obj),
+        raiseload('*')
+    ).filter(models.Order.shopper_id == db_shopper.id).all()
     
     # Get all dues for this shopper
     dues = db.query(models.Due).filter(models.Due.shopper_id == db_shopper.id).all()
     
-    # Calculate total due (sum of all dues)
-    total_due = sum(due.amount for due in dues)
+    # Calculate total due (sum of all dues) in the database
+    total_due = db.query(func.coalesce(func.sum(models.Due.amount), 0))\
+        .filter(models.Due.shopper_id == db_shopper.id).scalar()
     
+    # Rows come straight from the database, so the body is built with model_construct and
+    # returned directly instead of being validated again against response_model
     # Format orders with items
     formatted_orders = []
     for order in orders:
         order_items = []
         for item in order.items:
-            order_items.append(history_schemas.OrderItemHistory(
+            order_items.append(history_schemas.OrderItemHistory.model_construct(
                 id=item.id,
                 item_name=item.item.name if item.item else "Unknown Item",
                 size_label=item.size_label,
@@ -79,7 +198,7 @@ def get_customer_history(customer_code: str, db: Session = Depends(get_db)):
                 discount_applied=item.discount_applied
             ))
         
-        formatted_orders.append(history_schemas.OrderHistory(
+        formatted_orders.append(history_schemas.OrderHistory.model_construct(
             id=order.id,
             transaction_id=order.transaction_id,
             date=order.date,
@@ -90,7 +209,7 @@ def get_customer_history(customer_code: str, db: Session = Depends(get_db)):
     
     # Format dues
     formatted_dues = [
-        history_schemas.DueHistory(
+        history_schemas.DueHistory.model_construct(
             id=due.id,
             amount=due.amount,
             description=due.description,
@@ -100,12 +219,12 @@ def get_customer_history(customer_code: str, db: Session = Depends(get_db)):
         for due in dues
     ]
     
-    return history_schemas.CustomerHistoryResponse(
+    return ORJSONResponse(history_schemas.CustomerHistoryResponse.model_construct(
         customer_code=db_shopper.customer_code,
         name=db_shopper.name,
         phone_number=db_shopper.phone_number,
         address=db_shopper.address,
         orders=formatted_orders,
         dues=formatted_dues,
-        total_due=total_due
-    )
+        total_due=float(total_due)
+    ).model_dump())
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import List, Optional
 
@@ -28,8 +28,14 @@ class CategoryInDB(CategoryBase):
 class CategoryResponse(CategoryInDB):
     pass
 
+class CategoryItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    name: str
+    created_at: datetime
+
 class CategoryWithItems(CategoryInDB):
-    items: List[dict] = []
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    items: List[CategoryItem] = []
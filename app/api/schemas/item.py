@@ -66,16 +66,35 @@ class ItemResponse(ItemBase):
         }
 
     @classmethod
-    def from_orm(cls, obj):
-        # Custom from_orm to handle the category relationship
-        item_dict = super().from_orm(obj).dict()
-        if hasattr(obj, 'category_obj') and obj.category_obj:
-            item_dict['category'] = {
+    def from_orm_fast(cls, obj):
+        # Build straight from the ORM item (no validation passes), including the category relationship
+        category = None
+        if getattr(obj, 'category_obj', None):
+            category = {
                 'id': obj.category_obj.id,
                 'name': obj.category_obj.name,
                 'discount': getattr(obj.category_obj, 'discount', None)
             }
-        return cls(**item_dict)
+        return cls.model_construct(
+            id=obj.id,
+            name=obj.name,
+            category_id=obj.category_id,
+            image_url=obj.image_url,
+            created_at=obj.created_at,
+            sizes=[
+                ItemSizeResponse.model_construct(
+                    id=size.id,
+                    item_id=size.item_id,
+                    size_label=size.size_label,
+                    price=size.price,
+                    discount=size.discount,
+                    stock=size.stock,
+                    created_at=size.created_at
+                )
+                for size in obj.sizes
+            ],
+            category=category
+        )
 
 class ItemListResponse(BaseModel):
     id: str
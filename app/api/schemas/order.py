@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict, AliasChoices, AliasPath
 from typing import List, Optional
 from datetime import datetime
 
@@ -14,17 +14,20 @@ class OrderCreate(BaseModel):
     is_paid: bool = True
 
 class OrderItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     item_id: str
-    item_name: str
+    # When validated from an OrderItem, names are read through its item relationship
+    item_name: str = Field(validation_alias=AliasChoices("item_name", AliasPath("item", "name")))
     size_label: str
     quantity: int
     price_at_purchase: float
     discount_applied: Optional[float] = None
-    category_name: str
-
-    class Config:
-        orm_mode = True
+    category_name: str = Field(
+        "Uncategorized",
+        validation_alias=AliasChoices("category_name", AliasPath("item", "category_obj", "name"))
+    )
 
 class ShopperInfo(BaseModel):
     """Basic shopper information for order responses"""
@@ -43,6 +46,8 @@ class BalanceSummary(BaseModel):
     advance_balance: float = 0.0
 
 class OrderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     transaction_id: str
     date: datetime
@@ -0,0 +1,78 @@
+import os
+from typing import Optional, Tuple
+
+from app.core.logging import get_logger
+
+try:
+    import redis
+except ImportError:  # Caching stays disabled without the redis client
+    redis = None
+
+logger = get_logger("cache")
+
+# Shopper responses embed dues, which orders and returns also write, so every
+# write bumps one generation counter instead of tracking individual keys.
+# Stale generations simply expire.
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_PREFIX = "sf"
+SHOPPER_LIST_TTL = 60  # seconds
+SHOPPER_TTL = 300  # seconds
+
+_client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5) if redis and REDIS_URL else None
+_GENERATION_KEY = f"{CACHE_PREFIX}:shoppers:generation"
+
+def get_shopper_cache(name: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """Look up a cached shopper response body.
+    Returns the key to store a fresh body under (None when caching is off) and the cached body, if any.
+    The key is fixed before the database is read, so a write landing in between is never cached as current.
+    """
+    if _client is None:
+        return None, None
+    try:
+        generation = int(_client.get(_GENERATION_KEY) or 0)
+        key = f"{CACHE_PREFIX}:shoppers:{generation}:{name}"
+        return key, _client.get(key)
+    except redis.RedisError as e:
+        logger.warning("Shopper cache read failed: %s", e)
+        return None, None
+
+def set_shopper_cache(key: Optional[str], body: bytes, ttl: int):
+    """Store a rendered shopper response body under a key from get_shopper_cache."""
+    if _client is None or key is None:
+        return
+    try:
+        _client.set(key, body, ex=ttl)
+    except redis.RedisError as e:
+        logger.warning("Shopper cache write failed: %s", e)
+
+def invalidate_shoppers():
+    """Drop all cached shopper responses. Call after committing shopper or due changes."""
+    if _client is None:
+        return
+    try:
+        _client.incr(_GENERATION_KEY)
+    except redis.RedisError as e:
+        logger.warning("Shopper cache invalidation failed: %s", e)
+
+_USERS_GENERATION_KEY = f"{CACHE_PREFIX}:users:generation"
+
+def get_users_generation() -> Optional[int]:
+    """Current generation of the users table, shared by all workers.
+    None when caching is off or redis can't be reached.
+    """
+    if _client is None:
+        return None
+    try:
+        return int(_client.get(_USERS_GENERATION_KEY) or 0)
+    except redis.RedisError as e:
+        logger.warning("User cache generation read failed: %s", e)
+        return None
+
+def invalidate_users():
+    """Make every worker drop its cached users. Call after committing user changes."""
+    if _client is None:
+        return
+    try:
+        _client.incr(_USERS_GENERATION_KEY)
+    except redis.RedisError as e:
+        logger.warning("User cache invalidation failed: %s", e)
@@ -1,31 +1,36 @@
+import os
+
 from fastapi.middleware.cors import CORSMiddleware
 
+# Comma-separated list of frontend origins, e.g. "https://pos.example.com,http://localhost:3000".
+# A concrete list lets the middleware send static headers instead of echoing each request's
+# Origin; "*" is kept as the fallback so existing deployments keep working until it is set.
+# Browsers reject credentialed responses with a wildcard origin, so credentials are only
+# allowed once concrete origins are configured (the API authenticates with bearer tokens).
+ALLOWED_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
+ALLOW_CREDENTIALS = "*" not in ALLOWED_ORIGINS
+ALLOWED_METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"]
+ALLOWED_HEADERS = ["Authorization", "Content-Type"]
+EXPOSED_HEADERS = ["X-Next-Cursor"]
+
 def setup_cors(app):
     """
     Configure CORS middleware for the FastAPI application.
-    
+
     Args:
         app: FastAPI application instance
-        
+
     Returns:
         FastAPI: The configured FastAPI application
     """
-    # List of allowed origins (you can customize this list as needed)
-    allowed_origins = ["*"]
-    
-    # List of allowed methods
-    allowed_methods = ["*"]  # Allow all methods
-    
-    # List of allowed headers
-    allowed_headers = ["*"]  # Allow all headers
-    
     # Add CORS middleware to the FastAPI application
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=allowed_origins,
-        allow_credentials=True,
-        allow_methods=allowed_methods,
-        allow_headers=allowed_headers,
+        allow_origins=ALLOWED_ORIGINS,
+        allow_credentials=ALLOW_CREDENTIALS,
+        allow_methods=ALLOWED_METHODS,
+        allow_headers=ALLOWED_HEADERS,
+        expose_headers=EXPOSED_HEADERS,
     )
-    
+
     return app
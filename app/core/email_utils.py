@@ -1,18 +1,22 @@
 import smtplib
 import os
-import random
+import secrets
 import string
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 
+from app.core.logging import get_logger
+
 # Load environment variables
 load_dotenv()
 
+logger = get_logger("email")
+
 def generate_random_password(length=12):
     """Generate a random password with letters, digits, and special characters"""
     characters = string.ascii_letters + string.digits + "!@#$%^&*"
-    return ''.join(random.choice(characters) for _ in range(length))
+    return ''.join(secrets.choice(characters) for _ in range(length))
 
 def send_password_email(username, password):
     """Send the generated password to the receiver email"""
@@ -76,5 +80,5 @@ def send_password_email(username, password):
         server.quit()
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.error("Error sending password email for %s: %s", username, e)
         return False
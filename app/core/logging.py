@@ -1,16 +1,60 @@
 import logging
 import os
+import orjson
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 # Create logs directory if it doesn't exist
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# "json" writes one JSON object per line for log aggregators; anything else keeps plain text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+# Attributes every LogRecord has; anything else on a record was passed in `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class _JsonFormatter(logging.Formatter):
+    """Formats a record as a single JSON line, including any `extra` fields."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entry.update((k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+class _DailyFileHandler(logging.FileHandler):
+    """Appends to LOG_DIR/<name>_<YYYYMMDD>.log, moving on to the next day's file at midnight.
+    Files are never renamed, so several worker processes can share them safely.
+    """
+    def __init__(self, name: str):
+        self._log_name = name
+        self._day = datetime.now().strftime('%Y%m%d')
+        super().__init__(self._path())
+
+    def _path(self) -> str:
+        return os.path.join(LOG_DIR, f"{self._log_name}_{self._day}.log")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        day = datetime.fromtimestamp(record.created).strftime('%Y%m%d')
+        if day != self._day:
+            self._day = day
+            self.close()
+            self.baseFilename = os.path.abspath(self._path())
+        super().emit(record)
+
+@lru_cache(maxsize=128)
 def get_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
     """
     Get a logger with the specified name.
+    Configured once per name; later calls return the cached logger.
     
     Args:
         name (str): Name of the logger (will be used as part of the log filename)
@@ -23,21 +67,17 @@ def get_logger(name: str, log_level: int = logging.INFO) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Create log file handler
-    log_filename = f"{name}_{datetime.now().strftime('%Y%m%d')}.log"
-    log_path = os.path.join(LOG_DIR, log_filename)
-    
-    file_handler = logging.FileHandler(log_path)
-    file_handler.setFormatter(formatter)
-    
     # Add handler to logger if not already added
     if not logger.handlers:
+        file_handler = _DailyFileHandler(name)
+        if LOG_FORMAT == "json":
+            formatter = _JsonFormatter(datefmt='%Y-%m-%d %H:%M:%S')
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+        file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
     
     return logger
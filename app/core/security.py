@@ -2,9 +2,19 @@ from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 import os
+import time
+import hashlib
+import threading
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.core.cache import get_users_generation, invalidate_users
+from app.db.db import get_db
+from app.db.models import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("JWT_SECRET", "supersecret")  # fallback
@@ -14,6 +24,64 @@ REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 24 * 30  # 30 days
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Successfully decoded tokens, keyed by a hash of the token, so authenticated requests
+# skip the signature check and JSON decode. Entries are never used past the token's exp.
+# Sync endpoints run in the threadpool, so the cache is only touched under its lock.
+TOKEN_CACHE_TTL = 300  # seconds
+TOKEN_CACHE_SIZE = 10000
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+# Column values of recently loaded users by username, so per-request user lookups skip
+# the SELECT. Entries expire after USER_CACHE_TTL and are dropped when this process
+# updates or deletes the user. Each entry records the shared users generation it was
+# loaded under, and committing a user change bumps that generation, so other workers
+# stop using their copies too. Without REDIS_URL there is no shared generation, and a
+# change made by another worker is only seen once the entry expires.
+USER_CACHE_TTL = 60  # seconds
+USER_CACHE_SIZE = 1000
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+_user_cache_lock = threading.Lock()
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _drop_cached_user(mapper, connection, target):
+    with _user_cache_lock:
+        for username, (columns, _) in list(_user_cache.items()):
+            if columns["id"] == target.id:
+                _user_cache.pop(username, None)
+    session = object_session(target)
+    if session is not None:
+        session.info["users_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users_on_commit(session):
+    # Bumped only once the change is visible, so no worker can re-cache the old row under the new generation
+    if session.info.pop("users_changed", False):
+        invalidate_users()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_user_changes(session):
+    session.info.pop("users_changed", None)
+
+def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    """Return the User with this username, attached to `db`.
+    A cached user is merged into the session without querying the database.
+    """
+    generation = get_users_generation()
+    with _user_cache_lock:
+        cached = _user_cache.get(username)
+    if cached and cached[1] == generation:
+        user = User(**cached[0])
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    user = db.query(User).filter(User.username == username).first()
+    if user:
+        columns = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+        with _user_cache_lock:
+            _user_cache[username] = (columns, generation)
+    return user
+
 # Generate a random secret for refresh tokens
 def generate_refresh_token_secret():
     return os.urandom(32).hex()
@@ -40,10 +108,19 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None):
 
 def verify_token(token: str, token_type: str = "access"):
     """Verify a JWT token and return its payload"""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        payload = _token_cache.get(key)
+    if payload and payload.get("exp", 0) > time.time():
+        if payload.get("token_type") != token_type:
+            raise JWTError("Could not validate credentials: Invalid token type")
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if payload.get("token_type") != token_type:
             raise JWTError("Invalid token type")
+        with _token_cache_lock:
+            _token_cache[key] = payload
         return payload
     except JWTError as e:
         raise JWTError(f"Could not validate credentials: {str(e)}")
@@ -116,3 +193,19 @@ async def validate_admin_or_cashier(token: str = Depends(oauth2_scheme)):
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+def get_current_cashier(
+    request: Request,
+    token: dict = Depends(validate_cashier),
+    db: Session = Depends(get_db)
+):
+    """Return the authenticated cashier's User row.
+    Looked up once per request and kept on request.state.current_user for anything else that needs it.
+    """
+    user = getattr(request.state, "current_user", None)
+    if user is None:
+        user = get_user_by_username(db, token.get("sub"))
+        if not user:
+            raise HTTPException(status_code=404, detail="Cashier not found")
+        request.state.current_user = user
+    return user
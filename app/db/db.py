@@ -8,8 +8,26 @@ load_dotenv()  # Load env vars from .env
 
 DATABASE_URL = os.getenv("DATABASE_URL_LIVE")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool sized for concurrent cashier traffic; with N uvicorn workers each worker
+# gets its own pool, so size DB_POOL_SIZE ~= concurrent requests / N. Only the share of a
+# request spent waiting on the database holds a connection, so a pool smaller than the
+# request concurrency is fine as long as pool_size >= concurrency x that share.
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=int(os.getenv("DB_POOL_SIZE", 20)),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+    pool_pre_ping=True,  # Silently replace connections dropped by DB restarts / wait_timeout
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 30)),  # Fail fast with a 500 instead of queueing indefinitely
+    pool_use_lifo=True,  # Reuse the most recent connection; idle extras age out via pool_recycle
+)
+
+# Connections opened at startup, so the first requests after a deploy skip the connect handshake
+POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 5))
+
+# Sessions are request-scoped, so objects need not be expired on commit: responses built
+# after a commit read the values already in memory instead of reloading each row
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 
@@ -18,4 +36,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def warm_pool(count: int = POOL_WARMUP):
+    """Open `count` connections at once and return them to the pool."""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
\ No newline at end of file
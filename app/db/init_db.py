@@ -0,0 +1,28 @@
+"""Bring the database schema up to date. Run once per deploy: python -m app.db.init_db"""
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.db.db import engine
+from app.db import models
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic.ini")
+
+
+def init_db():
+    """An empty database gets every table from the models and is stamped as fully migrated.
+    Otherwise pending migrations run; a database from before migrations existed has no
+    alembic_version table and is upgraded from the first revision.
+    """
+    config = Config(ALEMBIC_INI)
+    if not inspect(engine).has_table(models.User.__tablename__):
+        models.Base.metadata.create_all(bind=engine)
+        command.stamp(config, "head")
+    else:
+        command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    init_db()
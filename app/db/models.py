@@ -1,16 +1,69 @@
 from sqlalchemy import (
-    Column, String, Integer, Float, ForeignKey, DateTime, Enum, Text, JSON
+    Column, String, Integer, Float, Numeric, ForeignKey, DateTime, Text, JSON, Computed, Index, CheckConstraint
 )
-from sqlalchemy import TIMESTAMP
-from sqlalchemy.dialects.mysql import CHAR, VARCHAR
-from sqlalchemy.orm import relationship
+from sqlalchemy import TIMESTAMP, BINARY
+from sqlalchemy.dialects.mysql import VARCHAR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
-from uuid import uuid4
-import enum
+from sqlalchemy.types import TypeDecorator
+from datetime import datetime
+from uuid import UUID, uuid1
+from strenum import StrEnum
 
 from .db import Base
 
-class UserRole(enum.Enum):
+# Money is stored exactly as DECIMAL(12,2), but read back (including SUMs over it) as plain
+# Python floats so responses never pay a Decimal conversion per field
+Money = Numeric(12, 2, asdecimal=False)
+
+class BinaryUUID(TypeDecorator):
+    """A UUID string stored as BINARY(16), with the time-low and time-high fields swapped.
+    For time-based (v1) UUIDs the slowly changing timestamp bytes then lead, so new rows
+    are appended near the end of the primary key index instead of at random leaves.
+    The application still sees the usual 36-character strings.
+    """
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            b = UUID(str(value)).bytes
+        except ValueError:
+            # Not a UUID, so it cannot match any row (e.g. a bogus id in a URL)
+            return None
+        return b[6:8] + b[4:6] + b[0:4] + b[8:]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(UUID(bytes=value[4:8] + value[2:4] + value[0:2] + value[8:]))
+
+def generate_id() -> str:
+    """New primary key value: a time-based UUID, which BinaryUUID stores in insertion order.
+    Ids are generated client-side rather than by a server default (UUID_TO_BIN(UUID(), 1)):
+    MySQL has no INSERT ... RETURNING, and flushed rows' ids are used before commit (order
+    lines in history descriptions, dues, response bodies). Since the ORM never fetches them
+    back, multi-row inserts still go out as batched executemany calls.
+    """
+    return str(uuid1())
+
+def _now() -> datetime:
+    """Insert timestamp, set client-side so the ORM never has to read it back after a flush.
+    Local time at second precision, like the timestamps the routes already write.
+    The server default stays for rows inserted outside the ORM.
+    """
+    return datetime.now().replace(microsecond=0)
+
+# Enum-like columns are plain strings guarded by a CHECK constraint: rows load as str with
+# no per-row enum conversion, and adding a value needs no ALTER of an ENUM column.
+# The StrEnum classes are the application-level constants and compare equal to the stored strings.
+def _one_of(table: str, column: str, values) -> CheckConstraint:
+    allowed = ", ".join(f"'{v.value}'" for v in values)
+    return CheckConstraint(f"{column} IN ({allowed})", name=f"ck_{table}_{column}")
+
+class UserRole(StrEnum):
     admin = "admin"
     cashier = "cashier"
 
@@ -18,11 +71,16 @@ class UserRole(enum.Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
     username = Column(String(50), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
-    role = Column(Enum(UserRole), default=UserRole.cashier)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    role = Column(String(16), nullable=False, default=UserRole.cashier)
+    created_at = Column(TIMESTAMP, default=_now, server_default=func.now())
+
+    __table_args__ = (
+        _one_of("users", "role", UserRole),
+    )
+
     inventory_actions = relationship("InventoryHistory", back_populates="performed_by")
     orders = relationship("Order", back_populates="cashier")
 
@@ -30,10 +88,12 @@ class User(Base):
 class Category(Base):
     __tablename__ = "categories"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
-    name = Column(String(50), nullable=False, unique=True, index=True)
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
+    # Case-insensitive but accent-sensitive collation (MySQL 8.0+): like lower(name), the unique
+    # index rejects names differing only by case, while "Cafe" and "Café" stay distinct
+    name = Column(VARCHAR(50, collation="utf8mb4_0900_as_ci"), nullable=False, unique=True, index=True)
     discount = Column(Float, nullable=True)  # Optional percentage (0-100) applied to all items in this category
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(TIMESTAMP, default=_now, server_default=func.now())
 
     items = relationship("Item", back_populates="category_obj")
 
@@ -41,40 +101,43 @@ class Category(Base):
 class Item(Base):
     __tablename__ = "items"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
     name = Column(String(100), nullable=False)
     image_url = Column(Text, nullable=True)
-    category_id = Column(CHAR(36), ForeignKey("categories.id"), nullable=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    category_id = Column(BinaryUUID, ForeignKey("categories.id"), nullable=True)
+    created_at = Column(TIMESTAMP, default=_now, server_default=func.now())
 
     sizes = relationship("ItemSize", back_populates="item")
     inventory_histories = relationship("InventoryHistory", back_populates="item")
-    category_obj = relationship("Category", back_populates="items")
+    category_obj = relationship("Category", back_populates="items", lazy="joined")  # Needed for pricing on nearly every read
 
 
 class ItemSize(Base):
     __tablename__ = "item_sizes"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
-    item_id = Column(CHAR(36), ForeignKey("items.id"))
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
+    item_id = Column(BinaryUUID, ForeignKey("items.id"))
     size_label = Column(String(20))  # e.g., Small, Medium, Large
     price = Column(Float, nullable=False)
     discount = Column(Float, nullable=True)  # Optional percentage (0-100)
     stock = Column(Integer, default=0, nullable=False)  # Add stock column
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    version = Column(Integer, nullable=False, default=0)  # Optimistic lock for concurrent stock updates
+    created_at = Column(TIMESTAMP, default=_now, server_default=func.now())
 
     item = relationship("Item", back_populates="sizes")
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Shopper(Base):
     __tablename__ = "shoppers"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
     customer_code = Column(String(50), unique=True, index=True, nullable=False)
     name = Column(String(100), nullable=False)
     phone_number = Column(String(20), nullable=True)
     address = Column(Text, nullable=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(TIMESTAMP, default=_now, server_default=func.now())
 
     orders = relationship("Order", back_populates="shopper")
     dues = relationship("Due", back_populates="shopper")
@@ -83,12 +146,17 @@ class Shopper(Base):
 class Due(Base):
     __tablename__ = "dues"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
-    shopper_id = Column(CHAR(36), ForeignKey("shoppers.id"), nullable=False)
-    order_id = Column(CHAR(36), ForeignKey("orders.id"), nullable=True)
-    amount = Column(Float, nullable=False)  # Positive for new due, negative for payment
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
+    shopper_id = Column(BinaryUUID, ForeignKey("shoppers.id"), nullable=False)
+    order_id = Column(BinaryUUID, ForeignKey("orders.id"), nullable=True, index=True)
+    amount = Column(Money, nullable=False)  # Positive for new due, negative for payment
     description = Column(Text, nullable=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(TIMESTAMP, default=_now, server_default=func.now())
+
+    __table_args__ = (
+        # Serves shopper_id lookups and covers the per-shopper SUM(amount) balance queries
+        Index("ix_dues_shopper_id_amount", "shopper_id", "amount"),
+    )
 
     shopper = relationship("Shopper", back_populates="dues")
     order = relationship("Order")
@@ -97,14 +165,29 @@ class Due(Base):
 class Order(Base):
     __tablename__ = "orders"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
     transaction_id = Column(String(100), unique=True, nullable=False)
-    date = Column(TIMESTAMP, server_default=func.now())
-    amount = Column(Float, nullable=False)
+    # Numeric form of transaction_id for sales (NULL for RETURN_... orders), computed by the database
+    transaction_id_num = Column(
+        Integer,
+        Computed("CASE WHEN transaction_id REGEXP '^[0-9]+$' THEN CAST(transaction_id AS UNSIGNED) END", persisted=True),
+        unique=True
+    )
+    date = Column(TIMESTAMP, default=_now, server_default=func.now(), index=True)
+    amount = Column(Money, nullable=False)
     details = Column(Text, nullable=True)
+    # Receipt lines frozen at creation (OrderItemResponse fields), so reprints read only this
+    # row; NULL for return orders and orders created before the column existed.
+    # Deferred so order listings don't carry it; the reprint queries undefer it.
+    items_snapshot = deferred(Column(JSON, nullable=True))
+
+    cashier_id = Column(BinaryUUID, ForeignKey("users.id"))
+    shopper_id = Column(BinaryUUID, ForeignKey("shoppers.id"), nullable=True)
 
-    cashier_id = Column(CHAR(36), ForeignKey("users.id"))
-    shopper_id = Column(CHAR(36), ForeignKey("shoppers.id"), nullable=True)
+    __table_args__ = (
+        # Per-cashier sales in a date range (staff performance) as an index range scan
+        Index("ix_orders_cashier_id_date", "cashier_id", "date"),
+    )
 
     cashier = relationship("User", back_populates="orders")
     shopper = relationship("Shopper", back_populates="orders")
@@ -114,19 +197,24 @@ class Order(Base):
 class OrderItem(Base):
     __tablename__ = "order_items"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
-    order_id = Column(CHAR(36), ForeignKey("orders.id"))
-    item_id = Column(CHAR(36), ForeignKey("items.id"))
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
+    order_id = Column(BinaryUUID, ForeignKey("orders.id"))
+    item_id = Column(BinaryUUID, ForeignKey("items.id"))
     size_label = Column(String(20))  # To record what size was bought
     quantity = Column(Integer, nullable=False)
-    price_at_purchase = Column(Float, nullable=False)
+    price_at_purchase = Column(Money, nullable=False)
     discount_applied = Column(Float, nullable=True)  # Percentage at time of purchase (0-100)
 
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_item_id", "item_id"),
+    )
+
     order = relationship("Order", back_populates="items")
-    item = relationship("Item")
+    item = relationship("Item", lazy="joined")  # Item name is shown with every order line
 
 
-class InventoryChangeType(enum.Enum):
+class InventoryChangeType(StrEnum):
     sale = "sale"
     restock = "restock"
     correction = "correction"
@@ -135,14 +223,26 @@ class InventoryChangeType(enum.Enum):
 class InventoryHistory(Base):
     __tablename__ = "inventory_history"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid4()))
-    item_id = Column(CHAR(36), ForeignKey("items.id"))
+    id = Column(BinaryUUID, primary_key=True, default=generate_id)
+    item_id = Column(BinaryUUID, ForeignKey("items.id"))
     change = Column(Integer, nullable=False)
-    type = Column(Enum(InventoryChangeType), nullable=False)
+    type = Column(String(16), nullable=False)
     description = Column(Text, nullable=True)
-    date = Column(TIMESTAMP, server_default=func.now())
+    date = Column(TIMESTAMP, default=_now, server_default=func.now())
 
-    performed_by_id = Column(CHAR(36), ForeignKey("users.id"))
+    performed_by_id = Column(BinaryUUID, ForeignKey("users.id"))
 
     item = relationship("Item", back_populates="inventory_histories")
-    performed_by = relationship("User", back_populates="inventory_actions")
+    performed_by = relationship("User", back_populates="inventory_actions", lazy="joined")
+
+    __table_args__ = (
+        _one_of("inventory_history", "type", InventoryChangeType),
+        # An item's or a user's history, newest first, without a filesort
+        Index("ix_inventory_history_item_id_date", "item_id", "date"),
+        Index("ix_inventory_history_performed_by_id_date", "performed_by_id", "date"),
+    )
+
+
+# Resolve relationships and build the mappers once at import (application startup) rather
+# than during the first request each worker serves
+Base.registry.configure()
@@ -1,9 +1,15 @@
 import logging
+import os
 import sys
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from app.db.db import engine
-from app.db import models
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.gzip import GZipMiddleware
+from app.db.init_db import init_db
+from app.db.db import engine, warm_pool
 from app.core.logging import get_logger
 from app.core.cors import setup_cors
 from app.api.api import include_routers
@@ -13,29 +19,68 @@ from fastapi import HTTPException
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+# The schema is created or migrated by `python -m app.db.init_db` at deploy time rather than
+# by every worker on import; AUTO_CREATE_TABLES=1 does it on import for local development
+if os.getenv("AUTO_CREATE_TABLES") == "1":
+    init_db()
 
 # Initialize root logger
 logger = get_logger("app")
+access_logger = get_logger("access")
 
-app = FastAPI(title="SanityFlow POS", version="1.0.0")
+class AccessLogMiddleware:
+    """Log one line per request (method, path, status, duration) in place of uvicorn's access log.
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses pass straight through.
+    """
+    def __init__(self, app):
+        self.app = app
 
-# Add startup event
-@app.on_event("startup")
-async def startup_event():
-    """Log application startup"""
-    logger.info("Application starting...")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            access_logger.info(
+                "%s %s %s %.1fms", scope["method"], scope["path"], status_code, duration_ms,
+                extra={"method": scope["method"], "path": scope["path"],
+                       "status": status_code, "duration_ms": duration_ms},
+            )
 
-# Add shutdown event
-@app.on_event("shutdown")
-def shutdown_event():
-    """Log application shutdown"""
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the connection pool on startup and close it on shutdown"""
+    logger.info("Application starting...")
+    try:
+        await run_in_threadpool(warm_pool)
+    except Exception as e:
+        # The app can still start; requests will connect on demand
+        logger.warning("Connection pool warmup failed: %s", e)
+    yield
     logger.info("Application shutting down...")
+    engine.dispose()
+
+app = FastAPI(title="SanityFlow POS", version="1.0.0", lifespan=lifespan)
 
 # Setup CORS
 app = setup_cors(app)
 
+# Compress larger JSON bodies (list endpoints); small responses go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
+# Outermost, so the logged duration covers CORS and compression too
+app.add_middleware(AccessLogMiddleware)
+
 # Include all API routers
 app = include_routers(app)
 
@@ -47,40 +92,39 @@ async def root():
 
 
 
-# Global exception handler
-@app.exception_handler(HTTPException)
-async def http_exception_handler(request: Request, exc: HTTPException):
-    """Handle HTTP exceptions"""
-    logger.error(f"HTTP error: {exc.detail}", exc_info=exc)
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={"detail": exc.detail},
-        headers=exc.headers if hasattr(exc, "headers") else None,
-    )
-
-@app.exception_handler(RequestValidationError)
-async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    """Handle request validation errors"""
-    logger.error(f"Request validation error: {exc.errors()}", exc_info=exc)
-    return JSONResponse(
-        status_code=422,
-        content={"detail": exc.errors(), "body": exc.body},
-    )
-
-@app.exception_handler(ValidationError)
-async def pydantic_validation_exception_handler(request: Request, exc: ValidationError):
-    """Handle Pydantic validation errors"""
-    logger.error(f"Pydantic validation error: {str(exc)}", exc_info=exc)
-    return JSONResponse(
-        status_code=422,
-        content={"detail": exc.errors()},
-    )
-
-@app.exception_handler(Exception)
-async def general_exception_handler(request: Request, exc: Exception):
-    """Handle all other exceptions"""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=exc)
+# Global exception handler: one function registered for each exception type. Expected
+# client errors are logged as a single line; only server-side failures pay for a traceback
+async def exception_handler(request: Request, exc: Exception):
+    """Turn HTTP, validation and unhandled exceptions into JSON error responses"""
+    if isinstance(exc, HTTPException):
+        if exc.status_code >= 500:
+            logger.error("HTTP error: %s", exc.detail, exc_info=exc,
+                         extra={"status": exc.status_code, "path": request.url.path})
+        else:
+            logger.warning("HTTP error %s: %s", exc.status_code, exc.detail,
+                           extra={"status": exc.status_code, "path": request.url.path})
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail},
+            headers=getattr(exc, "headers", None),
+        )
+    if isinstance(exc, RequestValidationError):
+        logger.warning("Request validation error: %s", exc.errors())
+        return JSONResponse(
+            status_code=422,
+            content=jsonable_encoder({"detail": exc.errors(), "body": exc.body}),
+        )
+    if isinstance(exc, ValidationError):
+        logger.error("Pydantic validation error: %s", exc, exc_info=exc)
+        return JSONResponse(
+            status_code=422,
+            content=jsonable_encoder({"detail": exc.errors()}),
+        )
+    logger.error("Unhandled exception: %s", exc, exc_info=exc, extra={"status": 500, "path": request.url.path})
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error"},
     )
+
+for exc_class in (HTTPException, RequestValidationError, ValidationError, Exception):
+    app.add_exception_handler(exc_class, exception_handler)
@@ -1,2 +1,4 @@
 #!/bin/bash
-uvicorn main:app --host 0.0.0.0 --port 10000
+# Apply pending migrations first; app.main no longer creates or migrates the schema on import
+python -m app.db.init_db && \
+uvicorn app.main:app --host 0.0.0.0 --port 10000 --workers ${WEB_CONCURRENCY:-2} --loop uvloop --http httptools --proxy-headers --no-access-log